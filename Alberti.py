@@ -164,7 +164,7 @@ class Alberti:
         """
         out_wheel = self.OUT_WHEEL
         in_wheel = self.get_key()[1]
-        n = utilities.get_positions(in_wheel, self.get_key()[0])[0][1]
+        n = utilities.make_alphabet(in_wheel).index(self.get_key()[0])
         in_wheel = utilities.shift_string(in_wheel, n, 'l')
         return out_wheel,in_wheel
 
@@ -193,20 +193,7 @@ class Alberti:
         ---------------------------------------------------
         """
         assert type(plaintext) == str
-        
-        out_wheel, in_wheel = self.get_wheels()
-        
-        ciphertext = ""
-        for i in range(len(plaintext)):
-            if plaintext[i].lower() not in out_wheel:
-                ciphertext += plaintext[i]
-            else:
-                index = utilities.get_positions(out_wheel, plaintext[i].lower())[0][1]
-                ciphertext += in_wheel[index]
-            if self.get_mode() == self.MODES[2] and (i+1)%self.PERIOD == 0 and i > 0:
-                in_wheel = utilities.shift_string(in_wheel, 1, 'r')
-                
-        return ciphertext
+        return self._transform(plaintext, False)
     
     def decrypt(self,ciphertext):
         """
@@ -218,23 +205,72 @@ class Alberti:
         ---------------------------------------------------
         """
         assert type(ciphertext) == str
+        return self._transform(ciphertext, True)
+    
+    def encrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of ciphertext chunks (str)
+        Description:  Encrypts a stream of plaintext chunks
+                      The periodic rotation continues across chunks,
+                        joined output is the same as encrypt(''.join(chunks))
+        ---------------------------------------------------
+        """
+        offset = 0
+        for chunk in chunks:
+            yield self._transform(chunk, False, offset)
+            offset += len(chunk)
+    
+    def decrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of plaintext chunks (str)
+        Description:  Decrypts a stream of ciphertext chunks (see encrypt_chunks)
+        ---------------------------------------------------
+        """
+        offset = 0
+        for chunk in chunks:
+            yield self._transform(chunk, True, offset)
+            offset += len(chunk)
+    
+    def _transform(self,text,decrypt,offset=0):
+        """
+        ----------------------------------------------------
+        Parameters:   text (str)
+                      decrypt (bool): True for decryption
+                      offset (int): position of text in the full message, default = 0
+        Return:       output (str)
+        Description:  Private helper of encrypt and decrypt
+                      In periodic mode the inner wheel starts rotated by
+                        offset//PERIOD so chunks can be processed separately
+        ---------------------------------------------------
+        """
         out_wheel, in_wheel = self.get_wheels()
+        periodic = self.get_mode() == self.MODES[2]
+        if periodic and offset >= self.PERIOD:
+            in_wheel = utilities.shift_string(in_wheel, offset//self.PERIOD, 'r')
         
-        plaintext = ""
-        for i in range(len(ciphertext)):
-            if ciphertext[i].lower() not in in_wheel:
-                plaintext += ciphertext[i]
+        out_alphabet = utilities.make_alphabet(out_wheel)
+        in_alphabet = utilities.make_alphabet(in_wheel)
+        output = ""
+        for i in range(len(text)):
+            if decrypt:
+                index = in_alphabet.find(text[i].lower())
+                output += text[i] if index == -1 else out_wheel[index]
             else:
-                index = utilities.get_positions(in_wheel, ciphertext[i].lower())[0][1]
-                plaintext += out_wheel[index]
-            if self.get_mode() == self.MODES[2] and (i+1)%self.PERIOD == 0 and i >0:
+                index = out_alphabet.find(text[i].lower())
+                output += text[i] if index == -1 else in_wheel[index]
+            if periodic and (offset+i+1)%self.PERIOD == 0:
                 in_wheel = utilities.shift_string(in_wheel, 1, 'r')
+                in_alphabet = utilities.make_alphabet(in_wheel)
                 
-        return plaintext
+        return output
     
 
     @staticmethod
-    def cryptanalyze(ciphertext,args=['','','',None,0.8]):
+    def cryptanalyze(ciphertext,args=['','','',None,0.8],scorer=None,top_k=None):
         """
         ----------------------------------------------------
         Static method
@@ -243,17 +279,23 @@ class Alberti:
                             pointer: (str): default = ''
                             in_wheel: (str): default = ''
                             mode: (str): default = ''
-                            dictionary_file (str): default = None
+                            dictionary_file (str): word list or snapshot, default = None
                             threshold (float): default = 0.8
+                      scorer (function): text --> fitness, default = None
+                      top_k (int): number of candidates to return, default = None
         Return:       key,plaintext
+                      or utilities.Candidate_List if top_k is given
+                        (candidate key = ((pointer,in_wheel), mode))
         Description:  Cryptanalysis of Alberti Cipher
                       Returns plaintext and key (pionter,in_wheel)
+                      With a scorer or top_k, every pointer in each mode is ranked by score
                       Assumes user passes a valid args list
+        Asserts:      top_k is None or a positive integer
         ---------------------------------------------------
         """  
+        assert top_k == None or (type(top_k) == int and top_k >= 1)
         #extract arguments
         pointer,in_wheel, mode, dictionary_file, threshold = args        
-        dict_list = utilities.load_dictionary(dictionary_file)
         
         mode_num = 0
         cycle = False
@@ -264,6 +306,29 @@ class Alberti:
         if in_wheel == "":
             in_wheel = alberti.DEFAULT_KEY[1]
         
+        if scorer != None or top_k != None:
+            if scorer == None:
+                scorer = utilities.dictionary_scorer(utilities.get_dictionary(dictionary_file))
+            def decrypt(key):#same steps as the loop below
+                cipher = Alberti()
+                cipher.set_mode(key[1])
+                cipher.set_key(key[0])
+                return cipher.decrypt(ciphertext)
+            results = utilities.Candidate_List(1 if top_k == None else top_k, decrypt)
+            modes = alberti.MODES if mode == "" else [mode]
+            for mode in modes:
+                alberti.set_mode(mode)
+                for pointer in alberti.OUT_WHEEL:
+                    alberti.set_key((pointer,in_wheel))
+                    plaintext = alberti.decrypt(ciphertext)
+                    results.add(scorer(plaintext), (alberti.get_key(), mode))
+            if top_k != None:
+                return results
+            key, plaintext = results.get_best()
+            return (key[0] if key != '' else key), plaintext
+        
+        dict_list = utilities.get_dictionary(dictionary_file)
+        
         if mode == "":
             cycle = True
         
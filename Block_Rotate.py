@@ -152,8 +152,7 @@ class Block_Rotate:
         """       
         assert type(plaintext) == str
         
-        positions = utilities.get_positions(plaintext, "\n")    
-        plaintext = utilities.clean_text(plaintext, "\n")
+        plaintext, mask = utilities.mask_text(plaintext, "\n")
         
         (b,r) = self.get_key()
         pad = self.get_pad()
@@ -163,7 +162,7 @@ class Block_Rotate:
         for word in mylist:
             ciphertext += utilities.shift_string(word, r, "l")
             
-        ciphertext = utilities.insert_positions(ciphertext, positions)    
+        ciphertext = mask.insert(ciphertext)
             
         return ciphertext
 
@@ -179,8 +178,7 @@ class Block_Rotate:
         """    
         assert type(ciphertext) == str
         
-        positions = utilities.get_positions(ciphertext, "\n")    
-        ciphertext = utilities.clean_text(ciphertext, "\n")
+        ciphertext, mask = utilities.mask_text(ciphertext, "\n")
         
         (b,r) = self.get_key()
         pad = self.get_pad()
@@ -190,11 +188,97 @@ class Block_Rotate:
         for word in mylist:
             plaintext += utilities.shift_string(word, r, "r")
             
-        plaintext = utilities.insert_positions(plaintext,positions)     
+        plaintext = mask.insert(plaintext)
         return plaintext.rstrip(pad)
 
+    def encrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of ciphertext chunks (str)
+        Description:  Encrypts a stream of plaintext chunks
+                      Partial blocks are carried to the next chunk,
+                        joined output is the same as encrypt(''.join(chunks))
+        ---------------------------------------------------
+        """
+        return self._stream(chunks, "l")
+    
+    def decrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of plaintext chunks (str)
+        Description:  Decrypts a stream of ciphertext chunks (see encrypt_chunks)
+                      Trailing pad characters are held back until the end
+                        of the stream, where they are removed as in decrypt
+        ---------------------------------------------------
+        """
+        pad = self.get_pad()
+        held = ''
+        for output in self._stream(chunks, "r"):
+            output = held + output
+            stripped = output.rstrip(pad)
+            held = output[len(stripped):]
+            yield stripped
+    
+    def _stream(self,chunks,d):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+                      d (str): rotation direction 'l' or 'r'
+        Return:       generator of output chunks (str)
+        Description:  Private helper of encrypt_chunks and decrypt_chunks
+                      template: input not yet written (gives newline positions)
+                      clean: input letters of the incomplete block
+                      queue: rotated letters not yet written
+        ---------------------------------------------------
+        """
+        (b,r) = self.get_key()
+        pad = self.get_pad()
+        template = clean = queue = ''
+        
+        for chunk in chunks:
+            template += chunk
+            clean += chunk.replace("\n", "")
+            full = len(clean) - len(clean)%b
+            queue += ''.join(utilities.shift_string(word, r, d)
+                             for word in utilities.text_to_blocks(clean[:full], b))
+            clean = clean[full:]
+            output, template, queue = Block_Rotate._fill(template, queue)
+            yield output
+        
+        queue += ''.join(utilities.shift_string(word, r, d)
+                         for word in utilities.text_to_blocks(clean, b, True, pad))
+        output, template, queue = Block_Rotate._fill(template, queue)
+        yield output + queue
+    
     @staticmethod
-    def cryptanalyze(ciphertext,args=[0,0,0,None,0.8]):
+    def _fill(template,queue):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   template (str): input text with newlines
+                      queue (str): output letters
+        Return:       output (str), template (str), queue (str)
+        Description:  Writes queue letters into the non-newline slots of template
+                      Returns the filled part and what remains of both
+        ---------------------------------------------------
+        """
+        letters, mask = utilities.mask_text(template, "\n")
+        n = min(len(letters), len(queue))
+        if n == len(letters):
+            cut = len(template)
+        else:
+            cut = n
+            for _, position in mask.get_positions():
+                if position > cut:
+                    break
+                cut += 1
+        letters, mask = utilities.mask_text(template[:cut], "\n")
+        return mask.insert(queue[:n]), template[cut:], queue[n:]
+
+    @staticmethod
+    def cryptanalyze(ciphertext,args=[0,0,0,None,0.8],scorer=None,top_k=None):
         """
         ----------------------------------------------------
         Static method
@@ -203,20 +287,26 @@ class Block_Rotate:
                             b0: minimum block size (int): default = 0
                             bn: maximum block size (int): default = 0
                             r: rotations (int): default = 0
-                            dictionary_file (str): default = None
+                            dictionary_file (str): word list or snapshot, default = None
                             threshold (float): default = 0.8
+                      scorer (function): text --> fitness, default = None
+                      top_k (int): number of candidates to return, default = None
         Return:       key,plaintext
+                      or utilities.Candidate_List if top_k is given
         Description:  Cryptanalysis of Block Rotate Cipher
                       Returns plaintext and key (r,b)
                       Attempts block sizes from b0 to bn (inclusive)
                       If bn is invalid or unspecified use 20
                       Minimum valid value for b0 is 2
+                      Long candidates are checked on a sample of their words first
+                      With a scorer or top_k, every (block size, rotation) is ranked by score
                       Assumes user passes a valid args list
+        Asserts:      top_k is None or a positive integer
         ---------------------------------------------------
         """
+        assert top_k == None or (type(top_k) == int and top_k >= 1)
         #extract arguments
         b0, bn, r, dictionary_file, threshold = args        
-        dict_list = utilities.load_dictionary(dictionary_file)
         
         block = Block_Rotate()
         plaintext = ""
@@ -228,6 +318,21 @@ class Block_Rotate:
         if b0 <= 0:
             b0 = 2
         
+        if scorer != None or top_k != None:
+            if scorer == None:
+                scorer = utilities.dictionary_scorer(utilities.get_dictionary(dictionary_file))
+            results = utilities.Candidate_List(1 if top_k == None else top_k, lambda key: Block_Rotate(key).decrypt(ciphertext))
+            for i in range(b0,bn+1):
+                rotations = range(i) if r == 0 else [r]
+                for j in rotations:
+                    block.set_key((i,j))
+                    results.add(scorer(block.decrypt(ciphertext)), (i,j))
+            if top_k != None:
+                return results
+            return results.get_best()
+        
+        dict_list = utilities.get_dictionary(dictionary_file)
+        
         for i in range(b0,bn+1):
             
             if r == 0:
@@ -235,14 +340,14 @@ class Block_Rotate:
                     key = (i,j)
                     block.set_key(key)
                     plaintext = block.decrypt(ciphertext)
-                    found = utilities.is_plaintext(plaintext, dict_list, threshold)
+                    found = utilities.is_plaintext(plaintext, dict_list, threshold, utilities.SAMPLE_SIZE)
                     
                     if found is True: break
             else:
                 key = (i,r)
                 block.set_key(key)
                 plaintext = block.decrypt(ciphertext)
-                found = utilities.is_plaintext(plaintext, dict_list, threshold)
+                found = utilities.is_plaintext(plaintext, dict_list, threshold, utilities.SAMPLE_SIZE)
                 if found is True: break
             if found == True:
                 break
@@ -244,24 +244,41 @@ class Scytale:
         return mylist
 
     @staticmethod
-    def cryptanalyze(ciphertext,args = [100,None,0.9]):
+    def cryptanalyze(ciphertext,args = [100,None,0.9],scorer=None,top_k=None):
         """
         ----------------------------------------------------
         Static method
         Parameters:   ciphertext (string)
                       args (list):
                         max_key (int): default 100
-                        dictionary_file (str): default = None
+                        dictionary_file (str): word list or snapshot, default = None
                         threshold (float): default = 0.9
+                      scorer (function): text --> fitness, default = None
+                      top_k (int): number of candidates to return, default = None
         Return:       key,plaintext
+                      or utilities.Candidate_List if top_k is given
         Description:  Cryptanalysis of Scytale Cipher
                       Apply brute force from key 1 up to max_key (inclusive)
+                      Long candidates are checked on a sample of their words first
+                      With a scorer or top_k, every key up to max_key is ranked by score
                       Assumes user passes a valid args list
+        Asserts:      top_k is None or a positive integer
         ---------------------------------------------------
         """
+        assert top_k is None or (type(top_k) is int and top_k >= 1)
         #extract arguments
         max_key, dictionary_file, threshold = args        
-        dict_list = utilities.load_dictionary(dictionary_file)
+        if scorer != None or top_k != None:
+            if scorer == None:
+                scorer = utilities.dictionary_scorer(utilities.get_dictionary(dictionary_file))
+            results = utilities.Candidate_List(1 if top_k is None else top_k, lambda key: Scytale(key, None).decrypt(ciphertext))
+            for i in range(1,max_key+1):
+                results.add(scorer(Scytale(i, None).decrypt(ciphertext)), i)
+            if top_k != None:
+                return results
+            return results.get_best()
+
+        dict_list = utilities.get_dictionary(dictionary_file)
         found = False
         i = 0
         
@@ -269,7 +286,7 @@ class Scytale:
             i += 1
             scytale = Scytale(i, None) 
             plaintext = scytale.decrypt(ciphertext)
-            found = utilities.is_plaintext(plaintext, dict_list, threshold)
+            found = utilities.is_plaintext(plaintext, dict_list, threshold, utilities.SAMPLE_SIZE)
                 
         key = i
             
@@ -6,6 +6,12 @@ Description: Shift Cipher
 """
 """Hope you have a great day my dude"""
 import utilities
+
+try:
+    import numpy as np
+except ImportError: #optional, only used by the batch functions
+    np = None
+
 class Cryptanalysis:
     """
     ----------------------------------------------------
@@ -28,9 +34,20 @@ class Cryptanalysis:
         ----------------------------------------------------
         """
         assert type(text) is str
-        
-        I = 0#return value
         freq = utilities.get_freq(text, base_type)#frequency of every character in text from given base_type        
+        return Cryptanalysis.index_of_coincidence_freq(freq)
+
+    @staticmethod
+    def index_of_coincidence_freq(freq):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   freq (list): character counts (see utilities.get_freq)
+        Return:       I (float): Index of Coincidence
+        Description:  Index of coincidence of a precomputed histogram
+        ----------------------------------------------------
+        """
+        I = 0#return value
         N = sum(freq)#total number of characters
         if N == 0: return 0 
 
@@ -44,6 +61,34 @@ class Cryptanalysis:
         I = I/((N*(N-1)))
         return I       
 
+    @staticmethod
+    def index_of_coincidence_batch(freq_matrix):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   freq_matrix (2D list/numpy array): one histogram per row
+                          (e.g. utilities.get_freq_batch)
+        Return:       I (numpy array or list): index of coincidence of every row
+        Description:  Vectorized index_of_coincidence_freq
+                      Rows with less than two characters give 0
+                      An empty matrix gives an empty result
+                      numpy array if numpy is installed, otherwise a list
+        ----------------------------------------------------
+        """
+        if np == None:
+            return [Cryptanalysis.index_of_coincidence_freq(freq) if sum(freq) > 1 else 0
+                    for freq in freq_matrix]
+        freq = np.asarray(freq_matrix, dtype=np.int64)
+        if freq.size == 0:#no rows, or rows without characters
+            return np.zeros(len(freq))
+        freq = freq.reshape(len(freq), -1)
+        N = freq.sum(axis=1)
+        pairs = (freq * (freq - 1)).sum(axis=1)
+        total = N * (N - 1)
+        I = np.zeros(len(freq))
+        np.divide(pairs, total, out=I, where=total > 0)
+        return I
+
     @staticmethod
     def IOC(text):
         """
@@ -108,13 +153,28 @@ class Cryptanalysis:
         ----------------------------------------------------
         """
         assert type(text) is str
-        lan_freq = utilities.get_language_freq(language)#frequency of characters in english language
+        return Cryptanalysis.chi_squared_freq(utilities.get_freq(text,None), language)
+
+    @staticmethod
+    def chi_squared_freq(freq,language='English'):
+        """
+        ----------------------------------------------------
+        Parameters:   freq (list): counts of a..z (see utilities.get_freq)
+                      language (str): default = 'English'
+        Return:       result (float)
+        Description:  Chi-squared statistics of a letter histogram
+                      chi_squared(text) == chi_squared_freq(get_freq(text,None))
+        Errors:       if language is unsupported:
+                        print error msg: 'Error(chi_squared): unsupported language'
+                        return -1
+        ----------------------------------------------------
+        """
+        lan_freq = utilities.get_language_freq(language)#cached frequency of characters in given language
         #Error: language is unsupported
         if lan_freq == []:
             print("Error(chi_squared): unsupported language")
             return -1
         result  = 0
-        freq = utilities.get_freq(text,None)
         N = sum(freq)#char count
         if N == 0: return -1#empty list return -1
         
@@ -123,13 +183,201 @@ class Cryptanalysis:
         x^2 = sigma(i = a,z) -----------
                                Ei
         """
-        #print("length = ",N)
         for i in range(26):
             den = lan_freq[i] * N #numerator/Ei -> expected count of char i
             num = pow(freq[i]-den,2)#denominator/ (ci - Ei)^2 -> ci = count of char i
             result += num/den
         return result
 
+    @staticmethod
+    def chi_squared_batch(freq_matrix,language='English'):
+        """
+        ----------------------------------------------------
+        Parameters:   freq_matrix (2D list/numpy array): counts of a..z, one row
+                          per candidate (e.g. utilities.get_freq_batch)
+                      language (str): default = 'English'
+        Return:       result (numpy array or list): chi-squared of every row
+        Description:  Vectorized chi_squared_freq, one call for all candidates
+                      Values match chi_squared_freq of each row (up to rounding)
+                      Rows without letters give -1
+                      An empty matrix gives an empty result
+                      numpy array if numpy is installed, otherwise a list
+        Errors:       if language is unsupported:
+                        print error msg: 'Error(chi_squared): unsupported language'
+                        return -1 for every row
+        ----------------------------------------------------
+        """
+        lan_freq = utilities.get_language_freq(language)
+        if lan_freq == []:
+            print("Error(chi_squared): unsupported language")
+            return [-1] * len(freq_matrix) if np == None else np.full(len(freq_matrix), -1.0)
+        if np == None:
+            return [Cryptanalysis.chi_squared_freq(freq, language) for freq in freq_matrix]
+        
+        freq = np.asarray(freq_matrix, dtype=np.int64)
+        if freq.size == 0:#no rows, or rows without letters
+            return np.full(len(freq), -1.0)
+        freq = freq.reshape(len(freq), -1)
+        N = freq.sum(axis=1)
+        result = np.zeros(len(freq))
+        for i in range(26):#same order of summation as chi_squared_freq
+            den = lan_freq[i] * N
+            result += (freq[:, i] - den) ** 2 / np.where(N == 0, 1, den)
+        result[N == 0] = -1
+        return result
+
+    @staticmethod
+    def coincidence_profile(ciphertext,max_shift=None):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   ciphertext (str)
+                      max_shift (int): default = None (half the cleaned text)
+        Return:       profile (list): profile[s] = matches between the
+                          cleaned ciphertext and itself shifted by s
+        Description:  Computes the coincidence count of every shift at once
+                      Cleans the text from all non-alpha characters first
+                      Upper and lower case characters are considered different chars
+                      profile[0] is the length of the cleaned text
+                      Peaks at multiples of the key length for Vigenere ciphertext
+        Asserts:      ciphertext is a string
+        ----------------------------------------------------
+        """
+        assert type(ciphertext) is str
+        ciphertext = utilities.clean_text(ciphertext, utilities.get_base('nonalpha') + "\t \n")#clean ciphertext
+        if max_shift == None:
+            max_shift = len(ciphertext)//2
+        return utilities.coincidence_counts(ciphertext, max_shift)
+
+    @staticmethod
+    def ioc_profile(ciphertext,max_period=None):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   ciphertext (str)
+                      max_period (int): default = None (half the letters)
+        Return:       profile (2D list): [[period, score],...] best first
+        Description:  Index of coincidence of the baskets of every period
+                        from 1 to max_period, for finding Vigenere key lengths
+                      score = matching letter pairs inside the baskets /
+                        all letter pairs inside the baskets
+                        (average basket IOC, weighted by basket size)
+                      With numpy: pairs at distance d are counted once for
+                        all periods (utilities.coincidence_counts), period p
+                        adds up the counts of d = p, 2p, 3p, ...
+                      Without numpy: letter histogram of every basket,
+                        O(n*max_period) instead of all n distances
+                      Only English letters are considered, case is ignored
+                      On equal score the shorter period is first
+        Asserts:      ciphertext is a string
+        ----------------------------------------------------
+        """
+        assert type(ciphertext) is str
+        codes = utilities.encode_letters(ciphertext)#letters as 0..25
+        n = len(codes)
+        if max_period == None:
+            max_period = n//2
+        if np != None:
+            counts = utilities.coincidence_counts(codes.decode('ascii'), max(n-1,0))
+        
+        profile = []
+        for period in range(1,max_period+1):
+            q, r = divmod(n, period)#r baskets of q+1 letters, period-r of q letters
+            total = r*(q+1)*q + (period-r)*q*(q-1)
+            if np != None:
+                pairs = 2*sum(counts[period::period])
+            else:
+                pairs = 0
+                for start in range(period):
+                    basket = codes[start::period]
+                    pairs += sum(c*(c-1) for c in map(basket.count, range(26)))
+            profile.append([period, pairs/total if total > 0 else 0])
+        profile.sort(key=lambda item: (-item[1], item[0]))
+        return profile
+
+    @staticmethod
+    def kasiski_distances(ciphertext,n=3):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   ciphertext (str)
+                      n (int): n-gram length, default = 3
+        Return:       distances (numpy array or list): distance between
+                          consecutive occurrences of every repeated n-gram
+        Description:  Kasiski examination of a ciphertext
+                      Only English letters are considered, case is ignored
+                      Longer repeats are covered by their n-grams
+                      n-grams are encoded as integers (base 26)
+                      With numpy: one stable argsort groups equal n-grams,
+                        distances are the gaps inside each group
+                      Without numpy: one pass with the last position of each n-gram
+                      Distances are in no particular order
+        Asserts:      ciphertext is a string, n is an integer from 3 to 13
+        ----------------------------------------------------
+        """
+        assert type(ciphertext) is str
+        assert type(n) == int and 3 <= n <= 13#26**13 fits in 64 bits
+        codes = utilities.encode_letters(ciphertext)
+        count = len(codes) - n + 1#number of n-grams
+        
+        if np != None:
+            if count < 2:
+                return np.zeros(0, dtype=np.int64)
+            values = np.frombuffer(codes, dtype=np.uint8).astype(np.int64)
+            grams = values[:count].copy()
+            for j in range(1,n):
+                grams = grams*26 + values[j:j+count]
+            order = np.argsort(grams, kind='stable')#positions ascending inside a group
+            grams = grams[order]
+            return (order[1:] - order[:-1])[grams[1:] == grams[:-1]]
+        
+        distances = []
+        last = {}#n-gram --> last position
+        for i in range(max(count,0)):
+            gram = codes[i:i+n]
+            if gram in last:
+                distances.append(i - last[gram])
+            last[gram] = i
+        return distances
+
+    @staticmethod
+    def kasiski(ciphertext,max_factor=20,n=3):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   ciphertext (str)
+                      max_factor (int): default = 20
+                      n (int): n-gram length, default = 3
+        Return:       factors (2D list): [[factor, score],...] best first
+        Description:  Factor histogram of the Kasiski distances
+                      (kasiski_distances) for factors 2 to max_factor
+                      score = distances divisible by factor * factor / distances
+                        about 1 by chance, higher for the key length and its multiples
+                      Distances are counted once (histogram), each factor adds
+                        up the counts of its multiples
+                      On equal score the smaller factor is first
+                      Returns an empty list if there are no repeated n-grams
+        Asserts:      ciphertext is a string
+        ----------------------------------------------------
+        """
+        distances = Cryptanalysis.kasiski_distances(ciphertext, n)
+        total = len(distances)
+        if total == 0:
+            return []
+        
+        if np != None:
+            histogram = np.bincount(distances)
+            counts = [int(histogram[f::f].sum()) for f in range(2,max_factor+1)]
+        else:
+            histogram = [0]*(max(distances)+1)
+            for distance in distances:
+                histogram[distance] += 1
+            counts = [sum(histogram[f::f]) for f in range(2,max_factor+1)]
+        
+        factors = [[f, counts[f-2]*f/total] for f in range(2,max_factor+1)]
+        factors.sort(key=lambda item: (-item[1], item[0]))
+        return factors
+
     @staticmethod
     def cipher_shifting(ciphertext,args =[20,26]):
         """
@@ -146,6 +394,7 @@ class Cryptanalysis:
                       Upper and lower case characters are considered different chars
                       The returned two keys, are the ones that produced highest matches
                           if equal, start with smaller value
+                      Matches of all shifts are counted at once (see coincidence_profile)
         Asserts:      ciphertext is a non-empty string
         ----------------------------------------------------
         """
@@ -154,16 +403,14 @@ class Cryptanalysis:
         ciphertext = utilities.clean_text(ciphertext, utilities.get_base('nonalpha') + "\t \n")#clean ciphertext
         assert ciphertext != ""
         key_lengths = [[0,0],[0,0]]#2 most matched key lengths: [# of matches, index]
-        matches = 0
-        shift_cipher = ciphertext
+        profile = utilities.coincidence_counts(ciphertext, max(factor-1,0))#matches of every shift
         
         for shift in range(1,factor):
             new_shift = shift#used with modulas when shift value goes over max key
             if shift > max_key_length:
                 new_shift = shift % max_key_length
                 
-            shift_cipher = " " + shift_cipher[:-1]#shift ciphertext by one character
-            matches = utilities.compare_texts(shift_cipher, ciphertext)
+            matches = profile[shift]
             
             #store if shifted ciphertext has a high in matches
             if matches > key_lengths[0][0]:
@@ -189,7 +436,9 @@ class Shift:
     ----------------------------------------------------
     """
     BASE = utilities.get_base('all') + ' '
+    ALPHABET = utilities.make_alphabet(BASE)
     DEFAULT_KEY = (3,26,51)   #lower case Caesar cipher
+    _TABLES = {} #key --> translation tables, shared by all instances
     
     def __init__(self,key=DEFAULT_KEY):
         """
@@ -198,12 +447,14 @@ class Shift:
                         #shifts, start_index, end_indx 
                         (inclusive both ends of indices)
         Description:  Shift constructor
-                      sets _key
+                      sets _key and builds its translation tables
         ---------------------------------------------------
         """
         self._key = self.DEFAULT_KEY
         if key != self.DEFAULT_KEY:
             self.set_key(key)
+        else:
+            self._build_tables()
     
     def get_key(self):
         """
@@ -223,6 +474,7 @@ class Shift:
         Description:  Sets Shift cipher key to given key
                       #shifts is set to smallest value
                       if invalid key --> set to default key
+                      Translation tables are rebuilt for the new key
         ---------------------------------------------------
         """ 
         if Shift.valid_key(key):
@@ -231,11 +483,34 @@ class Shift:
                 base_size = end - start + 1
                 shifts = base_size + shifts
             self._key = (shifts,start,end)
+            self._build_tables()
             return True
         else:
             self._key = self.DEFAULT_KEY
+            self._build_tables()
             return False
 
+    def _build_tables(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       -
+        Description:  Private helper of __init__ and set_key
+                      Sets the str.maketrans and bytes.maketrans tables
+                        (base --> sub and sub --> base) of the current key
+                      Tables are cached per key in _TABLES
+        ---------------------------------------------------
+        """
+        key = self.get_key()
+        if key not in Shift._TABLES:
+            base = self.get_base()
+            sub = self.get_sub(base)
+            Shift._TABLES[key] = (str.maketrans(base, sub), str.maketrans(sub, base),
+                                  bytes.maketrans(base.encode('ascii'), sub.encode('ascii')),
+                                  bytes.maketrans(sub.encode('ascii'), base.encode('ascii')))
+        (self._encrypt_table, self._decrypt_table,
+         self._encrypt_bytes, self._decrypt_bytes) = Shift._TABLES[key]
+
     def get_base(self):
         """
         ----------------------------------------------------
@@ -307,49 +582,99 @@ class Shift:
     def encrypt(self,plaintext):
         """
         ----------------------------------------------------
-        Parameters:   plaintext (str)
-        Return:       ciphertext (str)
+        Parameters:   plaintext (str/bytes)
+        Return:       ciphertext (str/bytes)
         Description:  Encryption using Shift Cipher
-        Asserts:      plaintext is a string
+                      One translate call with the table of the current key
+                      bytes input gives bytes output, bytes outside BASE are kept
+        Asserts:      plaintext is a string or bytes
         ---------------------------------------------------
         """
+        if type(plaintext) in (bytes, bytearray):
+            return plaintext.translate(self._encrypt_bytes)
         assert type(plaintext) is str
-        ciphertext = ""
-        base = self.get_base()
-        sub = self.get_sub(base)
-        
-        for char in plaintext:
-            if char not in base:#add characters that can't be substituted
-                ciphertext += char
-            else:
-                index = utilities.get_positions(base, char)[0][1]#find position of char in base str
-                ciphertext += sub[index]#add char from sub string at same position
-        return ciphertext
+        return plaintext.translate(self._encrypt_table)
 
     def decrypt(self,ciphertext):
         """
         ----------------------------------------------------
-        Parameters:   ciphertext (str)
-        Return:       plaintext (str)
+        Parameters:   ciphertext (str/bytes)
+        Return:       plaintext (str/bytes)
         Description:  Decryption using Shift Cipher
-        Asserts:      ciphertext is a string
+                      One translate call with the table of the current key
+                      bytes input gives bytes output, bytes outside BASE are kept
+        Asserts:      ciphertext is a string or bytes
         ---------------------------------------------------
         """
+        if type(ciphertext) in (bytes, bytearray):
+            return ciphertext.translate(self._decrypt_bytes)
         assert type(ciphertext) is str
-        plaintext = ""
-        base = self.get_base()
-        sub = self.get_sub(base)
-        
-        for char in ciphertext:
-            if char not in sub:#add characters that can't be substituted
-                plaintext += char
-            else:
-                index = utilities.get_positions(sub, char)[0][1]#find position of char in sub str
-                plaintext += base[index]#add char from base string at same position
-        return plaintext
+        return ciphertext.translate(self._decrypt_table)
+
+    def encrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of ciphertext chunks (str)
+        Description:  Encrypts a stream of plaintext chunks
+                      Shift cipher has no state, each chunk is encrypted alone
+        ---------------------------------------------------
+        """
+        for chunk in chunks:
+            yield self.encrypt(chunk)
+
+    def decrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of plaintext chunks (str)
+        Description:  Decrypts a stream of ciphertext chunks
+        ---------------------------------------------------
+        """
+        for chunk in chunks:
+            yield self.decrypt(chunk)
+
+    @staticmethod
+    def _rank(plaintext, scorer, language='English'):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   plaintext (str)
+                      scorer (function): None for the Chi-square method
+                      language (str): default = 'English'
+        Returns:      rank (float): lower is better
+        Description:  Private helper of cryptanalyze
+        ---------------------------------------------------
+        """
+        if scorer == None:
+            return Cryptanalysis.chi_squared(plaintext, language)
+        return -scorer(plaintext)
 
     @staticmethod
-    def cryptanalyze(ciphertext,args=['',-1,0]):
+    def _key_freq(key, counts):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   key (int,int,int): candidate key
+                      counts (list): ciphertext histogram over BASE
+        Returns:      freq (list): counts of a..z in the plaintext of key
+        Description:  Private helper of cryptanalyze
+                      Decryption only permutes the counts of base characters,
+                        so the plaintext histogram is found without decrypting
+                      Invalid keys decrypt with DEFAULT_KEY, as in Shift(key)
+        ---------------------------------------------------
+        """
+        if not Shift.valid_key(key):
+            key = Shift.DEFAULT_KEY
+        (shifts,start,end) = key
+        size = len(Shift.BASE[start:end+1])
+        plain = counts[:]#histogram of the plaintext
+        for i in range(size):
+            plain[start+i] = counts[start + (i+shifts)%size]
+        return [plain[26+i] + plain[i] for i in range(26)]#BASE starts with A..Z then a..z
+
+    @staticmethod
+    def cryptanalyze(ciphertext,args=['',-1,0],scorer=None,language='English',top_k=None):
         """
         ----------------------------------------------------
         Static method
@@ -358,40 +683,52 @@ class Shift:
                             base: (str): default = ''
                             shifts: (int): default = -1
                             base_length (int): default = -1 
+                      scorer (function): text --> fitness, default = None
+                      language (str): model used by chi_squared, default = 'English'
+                      top_k (int): number of candidates to return, default = None
         Return:       key,plaintext
+                      or utilities.Candidate_List if top_k is given
+                        (score = -chi, or the scorer value)
         Description:  Cryptanalysis of Shift Cipher
                       Returns plaintext and key (shift,start_indx,end_indx)
                       Uses the Chi-square method
+                      The ciphertext histogram is computed once, the histogram
+                        of every candidate key is found by permuting it and all
+                        candidates are scored with one chi_squared_batch call,
+                        only the best key is used to decrypt
+                      If a scorer is given (e.g. utilities.get_ngram_scorer),
+                        candidates are decrypted and ranked by highest score instead
+                      On equal rank the last candidate wins
                       Assumes user passes a valid args list
+        Asserts:      top_k is None or a positive integer
         ---------------------------------------------------
         """
+        assert top_k is None or (type(top_k) is int and top_k >= 1)
         base, shifts, base_length = args#extract arguments
         key = (0,0,0)
         plaintext = ''
-        return_value = [None,(0,0,0),'']#chi,key,plaintext
+        keys = []#candidate keys
         
         #1- Known base and number of shifts (trivial case)
         if base != '' and shifts != -1 and base_length != -1:
-            start_index = utilities.get_positions(Shift.BASE, base[0])[0][1]
-            end_index = utilities.get_positions(Shift.BASE, base[-1])[0][1]
+            start_index = Shift.ALPHABET.index(base[0])
+            end_index = Shift.ALPHABET.index(base[-1])
             
             key = (shifts, start_index, end_index)
             shift_cipher = Shift(key)
             plaintext = shift_cipher.decrypt(ciphertext)
+            if top_k != None:
+                results = utilities.Candidate_List(top_k)
+                results.add(-Shift._rank(plaintext, scorer, language), key, plaintext)
+                return results
+            return key,plaintext
         #2- Known base but unknown number of shifts
         elif base != '' and shifts == -1:
-            start_index = utilities.get_positions(Shift.BASE, base[0])[0][1]
-            end_index = utilities.get_positions(Shift.BASE, base[-1])[0][1]
+            start_index = Shift.ALPHABET.index(base[0])
+            end_index = Shift.ALPHABET.index(base[-1])
             
             for i in range(len(base)):
-                key = (i, start_index, end_index)
-                shift_cipher = Shift(key)
-                plaintext = shift_cipher.decrypt(ciphertext)
-                chi = Cryptanalysis.chi_squared(plaintext, )
-                if (return_value[0] == None or return_value[0] >= chi):
-                    return_value = [chi,key,plaintext]
-            key = return_value[1]
-            plaintext = return_value[2]          
+                keys.append((i, start_index, end_index))
         #3- unknown base, known shifts and known base length
         elif base == '' and shifts != -1 and base_length != -1:
             for start_index in range(len(Shift.BASE)):
@@ -400,14 +737,7 @@ class Shift:
                 else: break
                 for i in range(base_length):
                     end_index = start_index + i + 2
-                    key = (shifts, start_index, end_index) 
-                    shift_cipher = Shift(key)
-                    plaintext = shift_cipher.decrypt(ciphertext)                    
-                    chi = Cryptanalysis.chi_squared(plaintext,)
-                    if return_value[0] == None or chi <= return_value[0]:
-                        return_value = [chi,key,plaintext]
-            key = return_value[1]
-            plaintext = return_value[2]
+                    keys.append((shifts, start_index, end_index))
         #4- unknown base and shifts, known base length
         elif base == '' and shifts == -1:
             for start_index in range(len(Shift.BASE)):
@@ -417,16 +747,25 @@ class Shift:
                 for i in range(base_length):
                     end = i + start_index + 2
                     for shifts in range(base_length):
-                        key = (shifts, start_index, end) 
-                        shift_cipher = Shift(key)
-                        plaintext = shift_cipher.decrypt(ciphertext)
-                        chi = Cryptanalysis.chi_squared(plaintext, )                        
-                        if return_value[0] == None or return_value[0] >= chi:
-                            return_value = [chi,key,plaintext]
-                    
-            key = return_value[1]
-            plaintext = return_value[2]
-        return key,plaintext
+                        keys.append((shifts, start_index, end))
+        
+        results = utilities.Candidate_List(1 if top_k is None else top_k, lambda key: Shift(key).decrypt(ciphertext), True)
+        if scorer != None:
+            for key in keys:
+                plaintext = Shift(key).decrypt(ciphertext)
+                results.add(-Shift._rank(plaintext, scorer, language), key, plaintext)
+        elif len(keys) > 0:
+            char_counts = utilities.get_char_counts(ciphertext)
+            counts = [char_counts.get(char,0) for char in Shift.BASE]
+            chis = Cryptanalysis.chi_squared_batch([Shift._key_freq(key, counts) for key in keys], language)
+            for i in range(len(keys)):
+                results.add(-chis[i], keys[i])#plaintext is decrypted when read
+        
+        if top_k != None:
+            return results
+        if len(results) == 0:
+            return key,plaintext
+        return results.get_key(), results.get_plaintext()
     
     
     
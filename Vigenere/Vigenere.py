@@ -6,7 +6,12 @@ Description: Vigenere Cipher
 """
 """Hope you have a great day my dude"""
 import utilities
-import Shift_cipher
+from Shift_cipher import Cryptanalysis
+
+try:
+    import numpy as np
+except ImportError: #optional, only used to speed up large inputs
+    np = None
   
 class Vigenere:
     """
@@ -24,6 +29,15 @@ class Vigenere:
     """
     
     DEFAULT_KEY = 'k'
+    IOC_PERIODS = 100 #longest key length tried by the IOC profiler
+    IOC_BASKET = 10 #fewest letters per basket for a period to be profiled
+    IOC_CANDIDATES = 3 #key lengths taken from the IOC profile
+    IOC_RATIO = 0.85 #a divisor within this ratio of the IOC score replaces a period
+    KASISKI_FACTORS = 40 #largest factor of the Kasiski distances
+    KASISKI_CANDIDATES = 3 #key lengths taken from the Kasiski factors
+    KEY_LENGTH_SAMPLE = 1 << 16 #characters of the ciphertext used to find key lengths
+    _SQUARE = () #vigenere square, built once below the class
+    _TABLES = () #_TABLES[s]: str.translate table shifting both cases by s
     
     def __init__(self,key=DEFAULT_KEY):
         """
@@ -115,14 +129,31 @@ class Vigenere:
                       The square contains a list of strings
                       element 1 = "abcde...xyz"
                       element 2 = "bcde...xyza" (1 shift to left)
+                      Built once, a new list is returned on every call
+        ---------------------------------------------------
+        """
+        return list(Vigenere._SQUARE)
+
+    @staticmethod
+    def _make_square():
+        """
+        ----------------------------------------------------
+        static method
+        Parameters:   -
+        Return:       vigenere_square (tuple of string)
+                      tables (tuple of dict): tables[s] is a str.translate
+                          table shifting both cases by s
+        Description:  Private helper, builds the square and the tables once
         ---------------------------------------------------
         """
-        element = 'abcdefghijklmnopqrstuvwxyz'
+        element = utilities.get_base('lower')
         vigener_square = [element]
         for _ in range(len(element)-1):
             element = utilities.shift_string(element, 1, 'l')
             vigener_square.append(element)
-        return vigener_square
+        tables = tuple(str.maketrans(vigener_square[0] + vigener_square[0].upper(),
+                                     row + row.upper()) for row in vigener_square)
+        return tuple(vigener_square), tables
 
     def encrypt(self,plaintext):
         """
@@ -131,6 +162,8 @@ class Vigenere:
         Return:       ciphertext (str)
         Description:  Encryption using Vigenere Cipher
                       May use an auto character or a running key
+                      Only English letters are substituted, other characters
+                        (including other letters) are kept and use no key
         Asserts:      plaintext is a string
         ---------------------------------------------------
         """
@@ -148,32 +181,18 @@ class Vigenere:
         Return:       ciphertext (str)
         Description:  Private helper function
                       Encryption using Vigenere Cipher Using an autokey
+                      Key stream = autokey + plaintext letters (except last)
+                      Large texts shift all letters with one numpy modular add,
+                        otherwise uses autokey_chars
         ---------------------------------------------------
         """
-        ciphertext = ''
-        stripped_plaintext = ""
-        non_alpha = [] #char to add after encryption
-        subtext = self.get_key()
-        base = self.get_square()
+        if np == None or len(plaintext) < utilities.NUMPY_MIN:
+            return "".join(self.autokey_chars(plaintext))
         
-        for i in range(len(plaintext)):
-            char = plaintext[i]
-            if char.isalpha() == False:
-                non_alpha.append([char,i])
-            else: 
-                stripped_plaintext += char
-        subtext += stripped_plaintext[:-1]
-
-        for i in range(len(subtext)):
-            x = ord(stripped_plaintext[i].lower()) - 97
-            y = ord(subtext[i].lower()) - 97
-            if (stripped_plaintext[i].isupper()):
-                ciphertext += base[x][y].upper()
-            else:
-                ciphertext += base[x][y]
-            
-        ciphertext = utilities.insert_positions(ciphertext, non_alpha)
-        return ciphertext
+        codes, index, values = Vigenere._letter_values(plaintext)
+        first = Vigenere._key_values(self.get_key())[0]
+        shifts = np.concatenate(([first], values[:-1]))
+        return Vigenere._shift_letters(codes, index, values + shifts)
 
     def _encrypt_run(self,plaintext):
         """
@@ -184,35 +203,7 @@ class Vigenere:
                       Encryption using Vigenere Cipher Using a running key
         ---------------------------------------------------
         """
-        capital = False
-        ciphertext = ''
-        base = self.get_square()
-        key = self.get_key()
-        index = 0
-        sub = ""
-        for char in plaintext:
-            if char.isalpha() == False:  
-                sub += char
-            else:
-                sub += key[index]
-                index += 1;
-                if index >= len(key):
-                    index = 0
-                    
-        for i in range(len(sub)):
-            char = plaintext[i]
-            if char.isalpha():
-                if char.upper() == char:
-                    capital = True
-                y = ord(plaintext[i].lower()) - 97
-                x = ord(sub[i]) - 97
-                if capital == True:
-                    ciphertext += base[x][y].upper()
-                    capital = False
-                else:
-                    ciphertext += base[x][y]
-            else:ciphertext += plaintext[i]
-        return ciphertext
+        return self._run(plaintext, 1)
     
     def decrypt(self,ciphertext):
         """
@@ -221,6 +212,8 @@ class Vigenere:
         Return:       plaintext (str)
         Description:  Decryption using Vigenere Cipher
                       May use an auto character or a running key
+                      Only English letters are substituted, other characters
+                        (including other letters) are kept and use no key
         Asserts:      ciphertext is a string
         ---------------------------------------------------
         """
@@ -238,33 +231,46 @@ class Vigenere:
         Return:       plaintext (str)
         Description:  Private Helper method
                       Decryption using Vigenere Cipher Using autokey
+                      Each plaintext letter is the key of the next one:
+                        p[i] = c[i] - p[i-1], so with s[i] = c[0] - c[1] + ... ± c[i]
+                        p[i] = ±(s[i] - autokey), one numpy cumsum for large texts
+                      Otherwise uses autokey_chars
         ---------------------------------------------------
         """
-        non_alpha = []
-        plaintext = ""
-        subtext = self.get_key()
-        if ciphertext[0].isupper(): subtext = subtext.upper()
-        difference = 0
-        base = self.get_square()
+        if np == None or len(ciphertext) < utilities.NUMPY_MIN:
+            return "".join(self.autokey_chars(ciphertext, True))
         
-        for i in range(len(ciphertext)):
-    
-            if ciphertext[i].isalpha() == False:
-                non_alpha.append([ciphertext[i],i])
-                difference += 1
+        codes, index, values = Vigenere._letter_values(ciphertext)
+        first = Vigenere._key_values(self.get_key())[0]
+        signs = 1 - 2*(np.arange(len(values), dtype=np.int64) & 1)
+        values = signs*(np.cumsum(signs*values) - first)
+        return Vigenere._shift_letters(codes, index, values)
+
+    def autokey_chars(self,chars,decrypt=False):
+        """
+        ----------------------------------------------------
+        Parameters:   chars (iterable of str): single characters, e.g. a string
+                          or itertools.chain.from_iterable(file)
+                      decrypt (bool): True for decryption, default = False
+        Return:       generator of output characters (str)
+        Description:  Autokey encryption/decryption one character at a time
+                      Only the last plaintext letter is kept between characters,
+                        so unbounded input is processed with constant memory
+                      Uses the first character of the key as autokey
+        ---------------------------------------------------
+        """
+        base = Vigenere._SQUARE[0]
+        upper = base.upper()
+        x = Vigenere._key_values(self.get_key())[0]
+        
+        for char in chars:
+            code = (ord(char) | 32) - 97#0..25 only for English letters
+            if 0 <= code < 26:
+                y = (code - x)%26 if decrypt else (code + x)%26
+                yield upper[y] if char < 'a' else base[y]
+                x = y if decrypt else code
             else:
-                x = ord(subtext[i-difference].lower()) - 97
-                y = utilities.get_positions(base[x], ciphertext[i].lower())[0][1]
-    
-                if (ciphertext[i].isupper()):
-                    plaintext += base[0][y].upper()
-                    subtext += base[0][y].upper()
-                else:
-                    plaintext += base[0][y]
-                    subtext += base[0][y]
-            
-        plaintext = utilities.insert_positions(plaintext, non_alpha)
-        return plaintext
+                yield char
 
     def _decryption_run(self,ciphertext):
         """
@@ -275,36 +281,99 @@ class Vigenere:
                       Decryption using Vigenere Cipher Using running key
         ---------------------------------------------------
         """
-        plaintext = ''
-        capital = False
-        base = self.get_square()
-        key = self.get_key()
-        index = 0
-        sub = ""
-        for char in ciphertext:
-            if char.isalpha() == False:
-                sub += char.lower()
-            else:
-                sub += key[index]
-                index += 1;
-                if index >= len(key):
-                    index = 0
-                    
-        for i in range(len(sub)):
-            char = ciphertext[i]
-            if char.isalpha():
-                if char.upper() == char:
-                    capital = True
-                
-                x = ord(sub[i]) - 97
-                y = utilities.get_positions(base[x], char.lower())[0][1]
-                
-                if capital == True:
-                    plaintext += base[0][y].upper()
-                    capital = False
-                else:plaintext += base[0][y]
-            else:plaintext += char
-        return plaintext
+        return self._run(ciphertext, -1)
+
+    def _run(self,text,sign):
+        """
+        ----------------------------------------------------
+        Parameters:   text (str)
+                      sign (int): 1 for encryption, -1 for decryption
+        Return:       output (str)
+        Description:  Private Helper method, running key engine
+                      Letters are taken out of text (utilities.mask_letters)
+                      Key position j shifts the letters j, j+k, j+2k, ...
+                        with one str.translate call per key position
+                      Other characters are put back with the mask
+                      Large texts shift all letters with one numpy modular add
+        ---------------------------------------------------
+        """
+        key = [(sign*value)%26 for value in Vigenere._key_values(self.get_key())]
+        k = len(key)
+        
+        if np != None and len(text) >= utilities.NUMPY_MIN:
+            codes, index, values = Vigenere._letter_values(text)
+            return Vigenere._shift_letters(codes, index, values + np.resize(key, len(values)))
+        
+        letters, mask = utilities.mask_letters(text)
+        output = list(letters)
+        for j in range(k):
+            output[j::k] = letters[j::k].translate(Vigenere._TABLES[key[j]])
+        return mask.insert("".join(output))
+
+    @staticmethod
+    def _letter_values(text):
+        """
+        ----------------------------------------------------
+        Parameters:   text (str)
+        Return:       codes (numpy array): code points of text
+                      index (numpy array): positions of the English letters
+                      values (numpy array): letters as 0..25, case ignored
+        Description:  Private Helper method, requires numpy
+                      Lone surrogates (e.g. from utilities.file_to_text) are kept
+        ---------------------------------------------------
+        """
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        values = (codes | 32) - 97#wraps around for codes below 'a'
+        index = np.flatnonzero(values < 26)
+        return codes, index, values[index].astype(np.int64)
+
+    @staticmethod
+    def _key_values(key):
+        """
+        ----------------------------------------------------
+        Parameters:   key (str): lower case key
+        Return:       values (list): position of every key character in the alphabet
+        Description:  Private Helper method
+        ---------------------------------------------------
+        """
+        return [(ord(char) - 97)%26 for char in key]
+
+    @staticmethod
+    def _shift_letters(codes, index, values):
+        """
+        ----------------------------------------------------
+        Parameters:   codes (numpy array): code points of the input text
+                      index (numpy array): positions of the English letters
+                      values (numpy array): output letters as integers (any range)
+        Return:       output (str): input text with the letters at index replaced
+                          by values mod 26, case of the letters is kept
+        Description:  Private Helper method, requires numpy
+        ---------------------------------------------------
+        """
+        output = codes.copy()
+        output[index] = values%26 + 97 - 32*(codes[index] < 97)
+        return output.tobytes().decode('utf-32-le', 'surrogatepass')
+    
+    def encrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of ciphertext chunks (str)
+        Description:  Encrypts a stream of plaintext chunks (see Vigenere_Stream)
+                      joined output is the same as encrypt(''.join(chunks))
+        ---------------------------------------------------
+        """
+        return Vigenere_Stream(self.get_key()).process_chunks(chunks)
+    
+    def decrypt_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of plaintext chunks (str)
+        Description:  Decrypts a stream of ciphertext chunks (see encrypt_chunks)
+        ---------------------------------------------------
+        """
+        return Vigenere_Stream(self.get_key(), True).process_chunks(chunks)
     
     @staticmethod
     def cryptanalyze_key_length(ciphertext):
@@ -317,64 +386,265 @@ class Vigenere:
                       Combines results of Friedman and Cipher Shifting
                       Produces a list of key lengths from the above two functions
                       Start with Friedman and removes duplicates
+                      Friedman estimates and cipher shifting results below 1 are skipped
+                      Then adds the best IOC_CANDIDATES periods of the IOC profile
+                        (Cryptanalysis.ioc_profile) and the best KASISKI_CANDIDATES
+                        factors of the Kasiski examination (Cryptanalysis.kasiski),
+                        Kasiski factors that are multiples of a key length already
+                        in the list are skipped
+                      Every key length is replaced by its shortest divisor with a
+                        comparable IOC (see _reduce_period), as multiples of the key
+                        length have the same IOC and overfit the chi-squared key search
         ---------------------------------------------------
         """
-        friedman = Cryptanalysis.friedman(ciphertext)
-        c_shift = Cryptanalysis.cipher_shifting(ciphertext,)
-        key_lengths = []
+        friedman = [item for item in Cryptanalysis.friedman(ciphertext) if item > 0]#estimate can be <= 0
+        c_shift = [item for item in Cryptanalysis.cipher_shifting(ciphertext) if item > 0]#0 on short texts
+        candidates = []
         for item in friedman:
             if item in c_shift:
-                key_lengths.append(item)
+                candidates.append(item)
                 
         for item in friedman:
-            if item not in key_lengths:
-                key_lengths.append(item)
+            if item not in candidates:
+                candidates.append(item)
                 
         for item in c_shift:
-            if item not in key_lengths:
-                key_lengths.append(item)
+            if item not in candidates:
+                candidates.append(item)
+        
+        letters = len(utilities.encode_letters(ciphertext))
+        max_period = min(Vigenere.IOC_PERIODS, letters//Vigenere.IOC_BASKET)
+        profile = Cryptanalysis.ioc_profile(ciphertext, max_period)
+        scores = dict(profile)
+        candidates += [period for period, _ in profile if period != 1][:Vigenere.IOC_CANDIDATES]
+        
+        key_lengths = []
+        for period in candidates:
+            period = Vigenere._reduce_period(period, scores)
+            if period not in key_lengths:
+                key_lengths.append(period)
+        
+        factors = Cryptanalysis.kasiski(ciphertext, Vigenere.KASISKI_FACTORS)
+        for period, _ in factors[:Vigenere.KASISKI_CANDIDATES]:
+            period = Vigenere._reduce_period(period, scores)
+            if all(period%item != 0 for item in key_lengths if item > 1):#not covered by a shorter key length
+                key_lengths.append(period)
         
         return key_lengths
 
     @staticmethod
-    def cryptanalyze(ciphertext):
+    def _reduce_period(period, scores):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   period (int): candidate key length
+                      scores (dict): period --> IOC score (Cryptanalysis.ioc_profile)
+        Return:       period (int)
+        Description:  Private helper of cryptanalyze_key_length
+                      Returns the shortest divisor d > 1 of period scoring at least
+                        IOC_RATIO times the score of period, or period itself
+                      Periods without a score (longer than the profile) are kept
+        ---------------------------------------------------
+        """
+        if period not in scores:
+            return period
+        for d in range(2,period):
+            if period%d == 0 and d in scores and scores[d] >= Vigenere.IOC_RATIO*scores[period]:
+                return d
+        return period
+
+    @staticmethod
+    def _recover_keys(counts, n, key_lengths, language='English'):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   counts (2D list or numpy array): basket histograms of
+                          the cleaned ciphertext (see _basket_counts)
+                      n (int): length of the cleaned ciphertext
+                      key_lengths (list): candidate key lengths
+                      language (str): default = 'English'
+        Return:       keys (list): one key (str) per key length
+        Description:  Private helper of cryptanalyze
+                      Each basket (utilities.get_baskets with padding) gets the
+                        shift Shift.cryptanalyze finds for it with base a..z:
+                        the lowest chi-squared of the 26 rotations of the lower
+                        case histogram (upper case counts are not rotated),
+                        the last shift wins on equal values
+                      The 26 rotations of every basket of every key length are
+                        scored with a single Cryptanalysis.chi_squared_batch call
+        ---------------------------------------------------
+        """
+        pad = (utilities.get_base('upper') + utilities.get_base('lower')).find(utilities.PAD)
+        padded = []#baskets that get a pad character
+        start = 0
+        for k in key_lengths:
+            if n%k != 0:
+                padded.extend(range(start + n%k, start + k))
+            start += k
+        
+        if np != None:
+            counts = np.array(counts, dtype=np.int64).reshape(-1, 52)
+            if pad != -1:
+                counts[padded, pad] += 1
+            rotations = (np.arange(26)[:, None] + np.arange(26)[None, :])%26
+            freq = counts[:, None, :26] + counts[:, 26:][:, rotations]#basket x shift x letter
+            chis = Cryptanalysis.chi_squared_batch(freq.reshape(-1, 26), language).reshape(-1, 26)
+            values = 25 - np.argmin(chis[:, ::-1], axis=1)#last shift on equal values
+        else:
+            counts = [row[:] for row in counts]
+            if pad != -1:
+                for b in padded:
+                    counts[b][pad] += 1
+            freq = [[row[j] + row[26 + (i + j)%26] for j in range(26)]
+                    for row in counts for i in range(26)]
+            chis = Cryptanalysis.chi_squared_batch(freq, language)
+            values = []
+            for b in range(len(counts)):
+                row = chis[26*b:26*b + 26]
+                values.append(max(i for i in range(26) if row[i] == min(row)))
+        
+        keys = []
+        start = 0
+        for k in key_lengths:
+            keys.append("".join(chr(int(value) + 97) for value in values[start:start + k]))
+            start += k
+        return keys
+
+    @staticmethod
+    def _key_chis(ciphertext, keys, counts, language='English'):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   ciphertext (str)
+                      keys (list): candidate keys (str)
+                      counts (2D list or numpy array): basket histograms of the
+                          letters of ciphertext, for the lengths of keys in order
+                      language (str): default = 'English'
+        Return:       chis (list): chi_squared of the plaintext of every key
+        Description:  Private helper of cryptanalyze
+                      Running key decryption shifts every basket of letters by one
+                        key character, so the plaintext histogram is the sum of the
+                        rotated basket histograms and nothing is decrypted
+                      Autokeys (one character) are decrypted
+        ---------------------------------------------------
+        """
+        chis = []
+        start = 0
+        for key in keys:
+            if len(key) == 1:
+                chis.append(Cryptanalysis.chi_squared(Vigenere(key).decrypt(ciphertext), language))
+            else:
+                freq = [0]*26
+                for b in range(len(key)):
+                    row = counts[start + b]
+                    x = ord(key[b]) - 97
+                    for j in range(26):
+                        freq[j] += int(row[(j + x)%26] + row[26 + (j + x)%26])#both cases
+                chis.append(Cryptanalysis.chi_squared_freq(freq, language))
+            start += len(key)
+        return chis
+
+    @staticmethod
+    def _basket_counts(text, key_lengths, letters_only=False):
+        """
+        ----------------------------------------------------
+        Static Method
+        Parameters:   text (str)
+                      key_lengths (list): number of baskets of each block size
+                      letters_only (bool): default = False
+        Return:       counts (2D list or numpy array): one row per basket of every
+                          key length in order, counts of A..Z then a..z
+        Description:  Private helper of cryptanalyze
+                      Default: counts of utilities.get_baskets(text,k)
+                      letters_only: baskets of the English letters of text,
+                        as used by Vigenere encryption
+                      With numpy, the first k*(n//k) characters are viewed as
+                        blocks of k (one row per block), the basket number is
+                        added to every column and one bincount counts all baskets
+        ---------------------------------------------------
+        """
+        letters = utilities.get_base('upper') + utilities.get_base('lower')
+        if np == None:
+            if letters_only:
+                text = utilities.mask_letters(text)[0]
+            counts = []
+            for k in key_lengths:
+                for basket in utilities.get_baskets(text, k):
+                    char_counts = utilities.get_char_counts(basket)
+                    counts.append([char_counts.get(char, 0) for char in letters])
+            return counts
+        
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        values = (codes | 32) - 97#0..25 for English letters
+        symbols = np.where(values < 26, values + 26*(codes >= 97), 52).astype(np.int32)#52: not a letter
+        if letters_only:
+            symbols = symbols[symbols != 52]
+        n = len(symbols)
+        
+        matrices = []
+        for k in key_lengths:
+            full = n - n%k
+            blocks = symbols[:full].reshape(-1, k) + np.arange(0, 53*k, 53, dtype=np.int32)
+            matrix = np.bincount(blocks.ravel(), minlength=53*k)
+            matrix += np.bincount(symbols[full:] + np.arange(0, 53*(n - full), 53, dtype=np.int32),
+                                  minlength=53*k)
+            matrices.append(matrix.reshape(k, 53)[:, :52])
+        return np.concatenate(matrices) if matrices else np.zeros((0, 52), dtype=np.int64)
+
+    @staticmethod
+    def cryptanalyze(ciphertext,scorer=None,language='English',top_k=None):
         """
         ----------------------------------------------------
         Static method
         Parameters:   ciphertext (string)
+                      scorer (function): text --> fitness, default = None
+                      language (str): model used by chi_squared, default = 'English'
+                      top_k (int): number of candidates to return, default = None
         Return:       key,plaintext
+                      or utilities.Candidate_List if top_k is given
+                        (one candidate per key length, score = -chi or the scorer value)
         Description:  Cryptanalysis of Shift Cipher
                       Returns plaintext and key (shift,start_indx,end_indx)
                       Uses the key lengths produced by Vigenere.cryptanalyze_key_length
-                      Finds out the key, then apply chi_squared
+                        on the first KEY_LENGTH_SAMPLE characters of the cleaned text
+                      Finds out the key (Vigenere._recover_keys), then apply chi_squared
+                        to the plaintext histogram (Vigenere._key_chis)
+                      Only the returned candidates are decrypted (when read),
+                        or every candidate if a scorer is given
                       The key with the lowest chi_squared value is returned
+                      If a scorer is given (e.g. utilities.get_ngram_scorer),
+                        the key with the highest score is returned instead
         Asserts:      ciphertext is a non-empty string
+                      top_k is None or a positive integer
         ---------------------------------------------------
         """
         assert type(ciphertext) is str
+        assert top_k is None or (type(top_k) is int and top_k >= 1)
         #clean ciphertext
         new_ciphertext = utilities.clean_text(ciphertext, utilities.get_base('nonalpha') + "\t \n")
         assert ciphertext != ''
                 
-        key_length = Vigenere.cryptanalyze_key_length(new_ciphertext)#find key_length values
-        min_key = ["",None,""] 
+        sample = new_ciphertext[:Vigenere.KEY_LENGTH_SAMPLE]
+        key_length = Vigenere.cryptanalyze_key_length(sample)#find key_length values
+        counts = Vigenere._basket_counts(new_ciphertext, key_length)#one histogram per basket
+        keys = Vigenere._recover_keys(counts, len(new_ciphertext), key_length, language)
+        results = utilities.Candidate_List(1 if top_k is None else top_k, lambda key: Vigenere(key).decrypt(ciphertext))
         
-        for k in key_length:
-            C = utilities.text_to_blocks(new_ciphertext, k, True, )#blocks
-            S = utilities.blocks_to_baskets(C)#baskets
-
-            key = ''
-            for basket in S:
-                value = Shift.cryptanalyze(basket,[utilities.get_base('lower'), -1, k])[0][0]#find shift value from Shift.cryptanalyze() key
-                key += (chr(value + 97))#convert value to char (ex. 0 -> 'a')
-            vigenere_cipher = Vigenere(key)
-            plaintext = vigenere_cipher.decrypt(ciphertext)
-            chi = Cryptanalysis.chi_squared(plaintext, )
-
-            if (min_key[1] == None or min_key[1] > chi):
-                min_key = [key,chi,plaintext]
+        if scorer == None:
+            if not (new_ciphertext.isascii() and new_ciphertext.isalpha()):#not only English letters
+                counts = Vigenere._basket_counts(ciphertext, key_length, True)
+            chis = Vigenere._key_chis(ciphertext, keys, counts, language)
+            for i in range(len(keys)):
+                results.add(-chis[i], keys[i])#plaintext is decrypted when read
+        else:
+            for key in keys:
+                plaintext = Vigenere(key).decrypt(ciphertext)
+                results.add(scorer(plaintext), key, plaintext)
 
-        return min_key[0],min_key[2]
+        if top_k != None:
+            return results
+        return results.get_best()
+    
     
     
     
@@ -382,4 +652,111 @@ class Vigenere:
     
     
     
-    
\ No newline at end of file
+
+Vigenere._SQUARE, Vigenere._TABLES = Vigenere._make_square()
+
+
+class Vigenere_Stream:
+    """
+    ----------------------------------------------------
+    Description: Stateful Vigenere encryptor/decryptor for chunked input
+                 process(chunk) returns the output of one chunk and remembers
+                     the key phase for the next one:
+                     running key: key rotated by the number of letters seen
+                     autokey: last plaintext letter seen
+                 Only the current key is kept between chunks, so memory is
+                     bounded by the chunk size
+                 Joined output is the same as Vigenere(key).encrypt/decrypt
+                     of the joined input
+    ----------------------------------------------------
+    """
+    _NON_LETTERS = str.maketrans('', '', utilities.get_base('lower') + utilities.get_base('upper'))
+
+    def __init__(self,key=Vigenere.DEFAULT_KEY,decrypt=False):
+        """
+        ----------------------------------------------------
+        Parameters:   key (str): Vigenere key, default = Vigenere.DEFAULT_KEY
+                      decrypt (bool): True for decryption, default = False
+        Description:  Vigenere_Stream constructor
+                      An invalid key is replaced by the default key (see Vigenere)
+        ---------------------------------------------------
+        """
+        self._cipher = Vigenere(key)
+        self._start = self._cipher.get_key()
+        self._decrypt = decrypt
+
+    def __str__(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       output (str)
+        Description:  Vigenere Stream:
+                      key = <start key>, current = <key of next chunk>, mode = <encrypt/decrypt>
+        ---------------------------------------------------
+        """
+        output = 'Vigenere Stream:\n'
+        output += 'key = {}, current = {}, mode = {}'.format(
+            self._start, self.get_key(), 'decrypt' if self._decrypt else 'encrypt')
+        return output
+
+    def get_key(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       key (str)
+        Description:  Returns the key the next chunk will be processed with
+        ---------------------------------------------------
+        """
+        return self._cipher.get_key()
+
+    def reset(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       -
+        Description:  Restarts the stream at the original key
+        ---------------------------------------------------
+        """
+        self._cipher.set_key(self._start)
+
+    def process(self,chunk):
+        """
+        ----------------------------------------------------
+        Parameters:   chunk (str)
+        Return:       output (str)
+        Description:  Encrypts/decrypts the next chunk of the stream
+        Asserts:      chunk is a string
+        ---------------------------------------------------
+        """
+        assert type(chunk) == str, utilities.ASSERTION
+        cipher = self._cipher
+        key = cipher.get_key()
+        
+        if self._decrypt:
+            output = cipher.decrypt(chunk)
+            plaintext = output
+        else:
+            output = cipher.encrypt(chunk)
+            plaintext = chunk
+        
+        if len(key) == 1:
+            for char in reversed(plaintext):
+                if 0 <= (ord(char) | 32) - 97 < 26:
+                    cipher.set_key(char.lower())
+                    break
+        else:
+            index = (len(plaintext) - len(plaintext.translate(self._NON_LETTERS)))%len(key)
+            if index != 0:
+                cipher.set_key(key[index:] + key[:index])
+        return output
+
+    def process_chunks(self,chunks):
+        """
+        ----------------------------------------------------
+        Parameters:   chunks (iterable of str)
+        Return:       generator of output chunks (str)
+        Description:  Yields process(chunk) for every chunk, as they arrive
+        ---------------------------------------------------
+        """
+        for chunk in chunks:
+            yield self.process(chunk)
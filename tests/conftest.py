@@ -0,0 +1,13 @@
+"""
+-----------------------------
+Description: pytest setup, makes the cipher modules importable
+-----------------------------
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Vigenere'))
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus.txt')
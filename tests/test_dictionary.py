@@ -0,0 +1,67 @@
+"""
+-----------------------------
+Description: Dictionary snapshot round trip
+-----------------------------
+"""
+import pytest
+
+import utilities
+
+WORDS = ['cipher', 'key', 'alberti', 'vigenere', 'scytale', 'key', '', 'plaintext']
+
+
+def _compile(tmp_path):
+    dict_file = tmp_path / 'words.txt'
+    dict_file.write_text('\n'.join(WORDS) + '\n', encoding='ISO-8859-15')
+    snapshot_file = str(tmp_path / 'words.snap')
+    count = utilities.compile_dictionary(str(dict_file), snapshot_file)
+    return str(dict_file), snapshot_file, count
+
+
+def test_snapshot_round_trip(tmp_path):
+    dict_file, snapshot_file, count = _compile(tmp_path)
+    words = utilities.load_dictionary_set(dict_file)
+    assert count == len(words)
+    assert utilities.is_dictionary_snapshot(snapshot_file)
+
+    snapshot = utilities.open_dictionary(snapshot_file)
+    assert isinstance(snapshot, utilities.Dictionary_Snapshot)
+    try:
+        assert len(snapshot) == len(words)
+        for word in words:
+            assert word in snapshot
+        for word in ['', 'ciphe', 'keys', 'zzz', 'aaa', 'Cipher']:
+            assert (word in snapshot) == (word in words)
+    finally:
+        snapshot.close()
+
+
+def test_truncated_snapshot_is_rejected(tmp_path):
+    _, snapshot_file, _ = _compile(tmp_path)
+    with open(snapshot_file, 'rb') as file:
+        data = file.read()
+    for size in [2, 10, 20, len(data) - 1]:
+        with open(snapshot_file, 'wb') as file:
+            file.write(data[:size])
+        with pytest.raises(ValueError):
+            utilities.Dictionary_Snapshot(snapshot_file)
+
+
+def test_snapshot_outlives_cache(tmp_path):
+    _, snapshot_file, _ = _compile(tmp_path)
+    utilities.clear_dictionary_cache()
+    snapshot = utilities.get_dictionary(snapshot_file)
+    assert 'cipher' in snapshot
+
+    utilities.clear_dictionary_cache()
+    assert 'cipher' in snapshot
+    assert 'cipher' in utilities.get_dictionary(snapshot_file)
+    utilities.clear_dictionary_cache()
+
+
+def test_edited_dict_list_is_not_stale():
+    dict_list = [[] for _ in range(26)]
+    dict_list[2].append('cipher')
+    assert utilities.analyze_text('cipher', dict_list)[0] == 1
+    dict_list[2][0] = 'code'
+    assert utilities.analyze_text('cipher', dict_list)[0] == 0
@@ -0,0 +1,64 @@
+"""
+-----------------------------
+Description: Language model file round trip
+-----------------------------
+"""
+import math
+
+from conftest import CORPUS
+import utilities
+from Shift_cipher import Cryptanalysis, Shift
+
+SIZES = (2, 3)
+
+
+def test_language_model_round_trip(tmp_path):
+    model_file = str(tmp_path / 'corpus.lm')
+    #a small chunk size so that n-grams spanning two chunks are exercised
+    letters = utilities.build_language_model(CORPUS, model_file, SIZES, chunk_size=97)
+    with open(CORPUS, encoding='ISO-8859-15') as file:
+        text = file.read()
+    assert letters == len(utilities.encode_letters(text))
+
+    utilities.register_language('Round_Trip', model_file)
+    model = utilities.get_language_model('Round_Trip')
+    assert model['name'] == 'Round_Trip'
+    assert sorted(model['ngrams']) == list(SIZES)
+    assert min(model['unigram']) > 0 and abs(sum(model['unigram']) - 1) < 1e-3
+
+    for n in SIZES:
+        expected = utilities.build_ngram_model(text, n)
+        loaded = model['ngrams'][n]
+        assert loaded['n'] == n
+        assert loaded['floor'] == expected['floor']
+        assert list(loaded['table']) == list(expected['table'])
+
+    scorer = utilities.get_language_scorer('Round_Trip', 3)
+    assert scorer(text[:200]) == utilities.ngram_score(text[:200], utilities.build_ngram_model(text, 3))
+
+
+def test_invalid_language_model(tmp_path):
+    model_file = tmp_path / 'invalid.lm'
+    model_file.write_bytes(b'LANG\x01')
+    utilities.register_language('Invalid', str(model_file))
+    assert utilities.get_language_model('Invalid') == None
+
+
+def test_unseen_letters_are_smoothed(tmp_path):
+    with open(CORPUS, encoding='ISO-8859-15') as file:
+        text = file.read()
+    corpus = tmp_path / 'no_jqxz.txt'
+    corpus.write_text(text.translate(str.maketrans('', '', 'jqxzJQXZ')), encoding='ISO-8859-15')
+    model_file = str(tmp_path / 'no_jqxz.lm')
+    utilities.build_language_model(str(corpus), model_file, (2,))
+    utilities.register_language('No_JQXZ', model_file)
+    assert min(utilities.get_language_freq('No_JQXZ')) > 0
+
+    plaintext = text[:400]
+    key = (7, 26, 51)
+    ciphertext = Shift(key).encrypt(plaintext)
+    assert math.isfinite(Cryptanalysis.chi_squared(plaintext + ' zzz', 'No_JQXZ'))
+    freq = [utilities.get_freq(plaintext, None), utilities.get_freq('quiz jazz', None)]
+    assert all(math.isfinite(chi) for chi in Cryptanalysis.chi_squared_batch(freq, 'No_JQXZ'))
+    args = [utilities.get_base('lower'), -1, 0]
+    assert Shift.cryptanalyze(ciphertext, args, language='No_JQXZ') == (key, plaintext)
@@ -0,0 +1,13 @@
+"""
+-----------------------------
+Description: Batch cryptanalysis edge cases
+-----------------------------
+"""
+from Shift_cipher import Cryptanalysis
+
+
+def test_batch_of_empty_matrix():
+    assert list(Cryptanalysis.index_of_coincidence_batch([])) == []
+    assert list(Cryptanalysis.chi_squared_batch([])) == []
+    assert list(Cryptanalysis.index_of_coincidence_batch([[], []])) == [0, 0]
+    assert list(Cryptanalysis.chi_squared_batch([[], []])) == [-1, -1]
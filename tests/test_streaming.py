@@ -0,0 +1,61 @@
+"""
+-----------------------------
+Description: Chunked vs one-shot encryption
+-----------------------------
+"""
+import pytest
+
+from conftest import CORPUS
+import utilities
+from Shift_cipher import Shift
+from Vigenere import Vigenere
+from Alberti import Alberti
+from Block_Rotate import Block_Rotate
+
+CIPHERS = {
+    'shift': lambda: Shift((5, 26, 51)),
+    'running key': lambda: Vigenere('Lemon'),
+    'autokey': lambda: Vigenere('k'),
+    'alberti': lambda: Alberti(mode='periodic'),
+    'block rotate': lambda: Block_Rotate((5, 2)),
+}
+
+
+def _text():
+    with open(CORPUS) as file:
+        return file.read()[:1500] + '\nCafé, 42 déjà-vu!\r\n'
+
+
+def _chunks(text, sizes=(1, 7, 64, 3, 250)):
+    start = 0
+    i = 0
+    while start < len(text):
+        yield text[start:start + sizes[i % len(sizes)]]
+        start += sizes[i % len(sizes)]
+        i += 1
+
+
+@pytest.mark.parametrize('name', sorted(CIPHERS))
+def test_chunks_match_one_shot(name):
+    text = _text()
+    ciphertext = CIPHERS[name]().encrypt(text)
+    assert ''.join(CIPHERS[name]().encrypt_chunks(_chunks(text))) == ciphertext
+    plaintext = CIPHERS[name]().decrypt(ciphertext)
+    assert ''.join(CIPHERS[name]().decrypt_chunks(_chunks(ciphertext))) == plaintext
+
+
+@pytest.mark.parametrize('name', sorted(CIPHERS))
+def test_file_round_trip(name, tmp_path):
+    text = _text()
+    src, dst, out = (str(tmp_path / f) for f in ('plain.txt', 'cipher.txt', 'out.txt'))
+    with open(src, 'w', encoding='utf-8', newline='') as file:
+        file.write(text)
+
+    ciphertext = CIPHERS[name]().encrypt(text)
+    assert utilities.encrypt_file(src, dst, CIPHERS[name](), chunk_size=11) == len(ciphertext)
+    with open(dst, encoding='utf-8', newline='') as file:
+        assert file.read() == ciphertext
+
+    utilities.decrypt_file(dst, out, CIPHERS[name](), chunk_size=13)
+    with open(out, encoding='utf-8', newline='') as file:
+        assert file.read() == CIPHERS[name]().decrypt(ciphertext)
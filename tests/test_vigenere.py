@@ -0,0 +1,52 @@
+"""
+-----------------------------
+Description: Vigenere key recovery regression check
+-----------------------------
+"""
+import random
+
+from conftest import CORPUS
+from Vigenere import Vigenere
+
+SAMPLES = 40
+BASELINE_RECOVERED = 31 #plaintexts recovered on the same samples before the IOC and Kasiski key lengths
+
+
+def _samples(seed=0):
+    """
+    Random (key, plaintext) pairs: keys of 2 to 12 letters,
+    plaintexts of 300 to 2000 characters cut from the corpus
+    """
+    with open(CORPUS) as file:
+        text = file.read()
+    rand = random.Random(seed)
+    for _ in range(SAMPLES):
+        key = ''.join(rand.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rand.randint(2, 12)))
+        size = rand.choice([300, 500, 800, 1200, 2000])
+        start = rand.randrange(len(text) - size)
+        yield key, text[start:start + size]
+
+
+def test_recovery_rate_not_below_baseline():
+    recovered = 0
+    for key, plaintext in _samples():
+        ciphertext = Vigenere(key).encrypt(plaintext)
+        recovered += Vigenere.cryptanalyze(ciphertext)[1] == plaintext
+    assert recovered >= BASELINE_RECOVERED
+
+
+
+def test_kasiski_multiples_do_not_replace_short_keys():
+    with open(CORPUS) as file:
+        text = file.read()
+    for key, start in [('ymfy', 100), ('ymfy', 800), ('mrf', 0), ('mrf', 800)]:
+        plaintext = text[start:start + 300]
+        key_found, decrypted = Vigenere.cryptanalyze(Vigenere(key).encrypt(plaintext))
+        assert decrypted == plaintext
+        assert len(key_found) == len(key)
+
+
+def test_short_ciphertext_has_no_key_length():
+    ciphertext = Vigenere('key').encrypt('hello')
+    assert Vigenere.cryptanalyze_key_length(ciphertext) == []
+    assert Vigenere.cryptanalyze(ciphertext) == ('', '')
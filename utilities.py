@@ -4,12 +4,65 @@ Name: Torin Borton-McCallum
 Description: Utilitites File for Ciphers
 -----------------------------
 """
+import array
+import base64
+import functools
+import heapq
+import math
+import mmap
+import os
+import random
+import re
+import threading
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError: #optional, only used to speed up large inputs
+    np = None
 
 SCHAR = "-!@#$%^&*<>\.,():;\"'{[]}+_=)" #list of special characters
 B6 = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ \n" #B6 code characters
 DICT_FILE = 'engmix.txt'
 ASSERTION = 'invalid input'
 PAD = 'q'
+SNAPSHOT_MAGIC = b'WDIC' #first bytes of a compiled dictionary snapshot
+SNAPSHOT_VERSION = 1
+SAMPLE_SIZE = 400 #words scored by sample_plaintext before deciding
+NUMPY_MIN = 1 << 16 #minimum text length for the numpy code paths
+NGRAM_SIZE = 4 #default n-gram length (quadgrams)
+CHUNK_SIZE = 1 << 20 #characters read at a time by encrypt_file/decrypt_file
+ALPHABET_CACHE = 256 #Alphabets kept by make_alphabet (least recently used are dropped)
+
+_NON_LETTERS = bytes(i for i in range(128) if not 97 <= i <= 122) #deleted by encode_letters
+_NON_DIGITS = bytes(i for i in range(128) if not 48 <= i <= 57)
+_LETTER_CODES = bytes.maketrans(bytes(range(97, 123)), bytes(range(26))) #'a'..'z' --> 0..25
+_NOT_LETTER = re.compile('[^A-Za-z]') #removed by mask_letters
+_ngram_models = {} #(absolute corpus filename, n) --> model
+
+_ASCII_BITS = tuple(format(i, '08b') for i in range(256)) #char code --> 8 bits
+_B6_BITS = tuple(format(B6.index(chr(i)), '06b') if chr(i) in B6 else None for i in range(256)) #char code --> 6 bits
+_B6_INDEX = {B6[i]: i for i in range(len(B6))}
+_NON_B6 = bytes(i for i in range(256) if chr(i) not in B6)
+_BASE64 = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/' #base64 also packs 6-bit codes
+_B6_TO_BASE64 = bytes.maketrans(B6.encode('ascii'), _BASE64)
+_BASE64_TO_B6 = bytes.maketrans(_BASE64, B6.encode('ascii'))
+_popcount = getattr(int, 'bit_count', lambda x: bin(x).count('1')) #int.bit_count needs Python 3.10
+
+LANGUAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'languages') #<language>.lm model files
+LANGUAGE_MAGIC = b'LANG' #first bytes of a language model file
+LANGUAGE_VERSION = 1
+ENGLISH_FREQ = [0.08167,0.01492,0.02782, 0.04253, 0.12702,0.02228, 0.02015,
+                0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+                0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+                0.00978, 0.0236, 0.0015, 0.01974, 0.00074]
+_language_files = {} #language --> registered model filename
+_language_models = {} #language --> loaded model
+_language_lock = threading.Lock()
+
+_dict_cache = {} #absolute filename --> [size, mtime, dictionary]
+_dict_cache_stats = {'hits': 0, 'misses': 0}
+_dict_cache_lock = threading.Lock()
 
 def debug(ciphertext, size = 200):
     """
@@ -26,7 +79,6 @@ def debug(ciphertext, size = 200):
     base_str = 'abcdefghijklmnopqrstuvwxyz ,;-:?.'
     sub_str = ['-' for _ in range(len(base_str))]
     
-    _ = get_positions(ciphertext,'\n')
     ciphertext = clean_text(ciphertext,'\n')
     
     plaintext = ['-' for i in range(len(ciphertext))]
@@ -91,9 +143,25 @@ def get_base(base_type):
                       B6: num, lower, upper, space and newline
                       BA: upper + lower + num + special + ' \n'
                       all: upper, lower, numerical and special characters
+                  Base strings are built once (see get_alphabet)
     Errors:       if invalid base type, print error msg, return empty string
     ---------------------------------------------------
     """
+    if base_type not in _BASES:
+        print('Error(get_base): undefined base type')
+        return ''
+    return _BASES[base_type]
+
+'______________________________________________________________________________'
+
+def _make_bases():
+    """
+    ---------------------------------------------------- 
+    Parameters:   -
+    Return:       bases (dict): base_type --> base string
+    Description:  Private helper, builds the base strings of get_base once
+    ---------------------------------------------------
+    """
     lower = "".join([chr(ord('a')+i) for i in range(26)])
     upper = lower.upper()
     num = "".join([str(i) for i in range(10)])
@@ -101,34 +169,180 @@ def get_base(base_type):
     for i in range(ord('!'),127):
         if not chr(i).isalnum():
             special+= chr(i)
-            
-    result = ''
-    if base_type == 'lower':
-        result = lower
-    elif base_type == 'upper':
-        result = upper
-    elif base_type == 'alpha':
-        result = upper + lower
-    elif base_type == 'lowernum':
-        result = lower + num
-    elif base_type == 'uppernum':
-        result = upper + num
-    elif base_type == 'alphanum':
-        result = upper + lower + num
-    elif base_type == 'special':
-        result = special
-    elif base_type == 'nonalpha':
-        result = special + num
-    elif base_type == 'B6': #64 symbols
-        result = num + lower + upper + ' ' + '\n'
-    elif base_type == 'BA': #96 symbols
-        result = upper + lower + num + special + ' \n'
-    elif base_type == 'all':
-        result = upper + lower + num + special
-    else:
-        print('Error(get_base): undefined base type')
-        result = ''
-    return result
+    
+    return {'lower': lower,
+            'upper': upper,
+            'alpha': upper + lower,
+            'lowernum': lower + num,
+            'uppernum': upper + num,
+            'alphanum': upper + lower + num,
+            'special': special,
+            'nonalpha': special + num,
+            'B6': num + lower + upper + ' ' + '\n', #64 symbols
+            'BA': upper + lower + num + special + ' \n', #96 symbols
+            'all': upper + lower + num + special}
+
+_BASES = _make_bases()
+
+'______________________________________________________________________________'
+
+class Alphabet:
+    """
+    ----------------------------------------------------
+    Description: Immutable set of characters with precomputed lookups
+                 index: 256-entry array, char code --> position (-1 if absent)
+                 table: str.maketrans table deleting the characters
+                 bitmap: int with bit ord(char) set for every character
+                 Use make_alphabet or get_alphabet, which return a shared
+                     object per character string (bounded cache)
+    ----------------------------------------------------
+    """
+    __slots__ = ('_chars', '_index', '_table', '_bitmap', '_pattern')
+
+    def __init__(self, chars):
+        """
+        ----------------------------------------------------
+        Parameters:   chars (str): characters of the alphabet
+        Description:  Alphabet constructor, builds all lookup tables
+                      Repeated characters keep their first position
+        Asserts:      chars is a string
+        ---------------------------------------------------
+        """
+        assert type(chars) == str, ASSERTION
+        index = array.array('h', [-1]) * 256
+        bitmap = 0
+        for i in range(len(chars) - 1, -1, -1):
+            code = ord(chars[i])
+            if code < 256:
+                index[code] = i
+            bitmap |= 1 << code
+        pattern = None
+        if chars != "":
+            pattern = re.compile('[' + ''.join(re.escape(char) for char in chars) + ']')
+        object.__setattr__(self, '_chars', chars)
+        object.__setattr__(self, '_index', index)
+        object.__setattr__(self, '_table', str.maketrans('', '', chars))
+        object.__setattr__(self, '_bitmap', bitmap)
+        object.__setattr__(self, '_pattern', pattern)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Alphabet is immutable')
+
+    def __len__(self):
+        return len(self._chars)
+
+    def __str__(self):
+        return self._chars
+
+    def __contains__(self, char):
+        """
+        ----------------------------------------------------
+        Parameters:   char (str)
+        Return:       True/False
+        Description:  Membership test of a single character using the bitmap
+                      Strings that are not one character return False
+        ---------------------------------------------------
+        """
+        return type(char) == str and len(char) == 1 and (self._bitmap >> ord(char)) & 1 == 1
+
+    def get_chars(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       chars (str)
+        Description:  Returns the characters of the alphabet
+        ---------------------------------------------------
+        """
+        return self._chars
+
+    def get_table(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       table (dict): str.translate table deleting the characters
+        ---------------------------------------------------
+        """
+        return self._table
+
+    def get_pattern(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       pattern (re.Pattern): matches any single character
+                          of the alphabet, None for an empty alphabet
+        ---------------------------------------------------
+        """
+        return self._pattern
+
+    def find(self, char):
+        """
+        ----------------------------------------------------
+        Parameters:   char (str)
+        Return:       position (int): position of char, -1 if absent
+        Description:  Constant time lookup for codes below 256
+        ---------------------------------------------------
+        """
+        if char not in self:
+            return -1
+        code = ord(char)
+        return self._index[code] if code < 256 else self._chars.find(char)
+
+    def index(self, char):
+        """
+        ----------------------------------------------------
+        Parameters:   char (str)
+        Return:       position (int): position of char
+        Description:  Same as find but raises ValueError if char is absent
+        ---------------------------------------------------
+        """
+        position = self.find(char)
+        if position == -1:
+            raise ValueError('character not in alphabet')
+        return position
+
+'______________________________________________________________________________'
+
+def make_alphabet(chars):
+    """
+    ----------------------------------------------------
+    Parameters:   chars (str)
+    Return:       alphabet (Alphabet)
+    Description:  Returns the shared Alphabet of the given characters
+                  Alphabets are cached, the ALPHABET_CACHE most recently used
+                      strings are kept, so ad-hoc bases (clean_text, Alberti
+                      wheel rotations, ...) do not grow memory without bound
+    Asserts:      chars is a string
+    ---------------------------------------------------
+    """
+    assert type(chars) == str, ASSERTION
+    return _cached_alphabet(chars)
+
+@functools.lru_cache(maxsize=ALPHABET_CACHE)
+def _cached_alphabet(chars):
+    """
+    ----------------------------------------------------
+    Parameters:   chars (str)
+    Return:       alphabet (Alphabet)
+    Description:  Private helper of make_alphabet, bounded Alphabet cache
+    ---------------------------------------------------
+    """
+    return Alphabet(chars)
+
+'______________________________________________________________________________'
+
+def get_alphabet(base_type):
+    """
+    ----------------------------------------------------
+    Parameters:   base_type (str): see get_base
+    Return:       alphabet (Alphabet)
+    Description:  Returns the shared Alphabet of a base type
+    Errors:       if invalid base type, print error msg, return None
+    ---------------------------------------------------
+    """
+    if base_type not in _BASES:
+        print('Error(get_alphabet): undefined base type')
+        return None
+    return make_alphabet(_BASES[base_type])
 
 '______________________________________________________________________________'
 
@@ -138,21 +352,198 @@ def get_language_freq(language='English'):
     Parameters:   language (str): default = English 
     Return:       freq (list of floats) 
     Description:  Return frequencies of characters in a given language
-                  Current implementation supports English language
+                  Uses the cached model of get_language_model,
+                      English is built in, other languages are loaded from model files
+                  The returned list is shared, it should not be modified
                   If unsupported language --> print error msg and return []
     ---------------------------------------------------
     """
-    if language == 'English':
-        return [0.08167,0.01492,0.02782, 0.04253, 0.12702,0.02228, 0.02015,
-                0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
-                0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
-                0.00978, 0.0236, 0.0015, 0.01974, 0.00074]
-    else:
+    model = get_language_model(language)
+    if model == None:
         print('Error(get_language_freq): unsupported language')
         return []
+    return model['unigram']
     
 '______________________________________________________________________________'
 
+def register_language(language, model_file):
+    """
+    ----------------------------------------------------
+    Parameters:   language (str): language name
+                  model_file (str): file generated by build_language_model
+    Return:       -
+    Description:  Registers a model file for a language
+                  The file is only read on first use (get_language_model)
+                  Drops any model already loaded for that language
+                  Unregistered languages are looked up in LANGUAGE_DIR/<language>.lm
+    Asserts:      language and model_file are strings
+    ---------------------------------------------------
+    """
+    assert type(language) == str and type(model_file) == str, ASSERTION
+    with _language_lock:
+        _language_files[language] = model_file
+        _language_models.pop(language, None)
+    return
+
+'______________________________________________________________________________'
+
+def get_language_model(language='English'):
+    """
+    ----------------------------------------------------
+    Parameters:   language (str): default = English
+    Return:       model (dict):
+                      name (str): language name
+                      unigram (list of floats): frequencies of a..z,
+                          unseen letters get the frequency of 0.01 occurrences
+                      ngrams (dict): n --> n-gram model (see build_ngram_model)
+                  None if the language is unsupported
+    Description:  Language model registry
+                  Models are loaded lazily from their file and cached per process
+                  English has a built-in unigram table and no n-grams,
+                      unless a model file is registered or found for it
+    ---------------------------------------------------
+    """
+    with _language_lock:
+        if language in _language_models:
+            return _language_models[language]
+
+        model_file = _language_files.get(language)
+        if model_file == None and type(language) == str:
+            model_file = os.path.join(LANGUAGE_DIR, language + '.lm')
+            if not os.path.isfile(model_file):
+                model_file = None
+
+        model = None
+        if model_file != None:
+            model = _read_language_model(model_file, language)
+        elif language == 'English':
+            model = {'name': language, 'unigram': ENGLISH_FREQ, 'ngrams': {}}
+        if model != None:
+            _language_models[language] = model
+    return model
+
+'______________________________________________________________________________'
+
+def get_language_scorer(language='English', n=NGRAM_SIZE):
+    """
+    ----------------------------------------------------
+    Parameters:   language (str): default = English
+                  n (int): n-gram length, default = NGRAM_SIZE
+    Return:       scorer (function): scorer(text) --> float, higher is better
+    Description:  n-gram fitness function of a registered language model
+                  that can be passed to the cryptanalyze methods (scorer argument)
+    Errors:       if the language has no n-gram table of length n,
+                      print error msg and return None
+    ---------------------------------------------------
+    """
+    model = get_language_model(language)
+    if model == None or n not in model['ngrams']:
+        print('Error(get_language_scorer): unsupported language')
+        return None
+    ngram_model = model['ngrams'][n]
+    return lambda text: ngram_score(text, ngram_model)
+
+'______________________________________________________________________________'
+
+def build_language_model(corpus_file, model_file, sizes=(2, 3, NGRAM_SIZE), chunk_size=1 << 20):
+    """
+    ----------------------------------------------------
+    Parameters:   corpus_file (str): text file to train on
+                  model_file (str): output filename
+                  sizes (tuple): n-gram lengths to count, default = (2,3,NGRAM_SIZE)
+                  chunk_size (int): characters read at a time, default = 1MB
+    Return:       letters (int): number of letters counted
+    Description:  Builds a language model file from a corpus in one streaming pass
+                  Counts a..z (case insensitive) and every n-gram of the given sizes
+                  n-grams spanning two chunks are counted once
+                  Layout (native byte order, all uint64):
+                      magic (4 bytes), version, #tables
+                      26 letter counts
+                      for each table: n, then 26^n n-gram counts
+    Asserts:      sizes are integers between 1 and 5
+    ---------------------------------------------------
+    """
+    for n in sizes:
+        assert type(n) == int and 1 <= n <= 5, ASSERTION
+    sizes = sorted(set(sizes))
+    tables = {n: [0] * (26 ** n) if np == None else np.zeros(26 ** n, dtype=np.int64) for n in sizes}
+    tail = b''
+    letters = 0
+
+    with open(corpus_file, "r", encoding="ISO-8859-15") as file:
+        chunk = file.read(chunk_size)
+        while chunk != '':
+            codes = encode_letters(chunk)
+            letters += len(codes)
+            codes = tail + codes
+            for n in sizes:
+                skip = max(0, len(tail) - n + 1)#n-grams already counted in the previous chunk
+                indices = _ngram_indices(codes, n)[skip:]
+                if np != None:
+                    tables[n] += np.bincount(indices, minlength=26 ** n)
+                else:
+                    table = tables[n]
+                    for index in indices:
+                        table[index] += 1
+            tail = codes[-(sizes[-1] - 1):] if sizes[-1] > 1 else b''
+            chunk = file.read(chunk_size)
+
+    #letter counts: every letter starts one n-gram of the shortest size, except the last n-1
+    n = sizes[0]
+    step = 26 ** (n - 1)
+    if np != None:
+        unigram = [int(count) for count in tables[n].reshape(26, step).sum(axis=1)]
+    else:
+        unigram = [sum(tables[n][i * step:(i + 1) * step]) for i in range(26)]
+    for code in tail[len(tail) - n + 1:]:
+        unigram[code] += 1
+
+    with open(model_file, "wb") as file:
+        file.write(LANGUAGE_MAGIC)
+        array.array('Q', [LANGUAGE_VERSION, len(sizes)] + unigram).tofile(file)
+        for n in sizes:
+            array.array('Q', [n]).tofile(file)
+            if np != None:
+                tables[n].astype(np.uint64).tofile(file)
+            else:
+                array.array('Q', tables[n]).tofile(file)
+    return letters
+
+'______________________________________________________________________________'
+
+def _read_language_model(model_file, language):
+    """
+    ----------------------------------------------------
+    Parameters:   model_file (str): file generated by build_language_model
+                  language (str): language name
+    Return:       model (dict): see get_language_model, None if invalid file
+    Description:  Private helper of get_language_model
+    ---------------------------------------------------
+    """
+    try:
+        with open(model_file, "rb") as file:
+            if file.read(len(LANGUAGE_MAGIC)) != LANGUAGE_MAGIC:
+                return None
+            header = array.array('Q')
+            header.fromfile(file, 2 + 26)
+            if header[0] != LANGUAGE_VERSION:
+                return None
+            total = max(sum(header[2:]), 1)
+            unigram = [(count if count > 0 else 0.01) / total for count in header[2:]]#unseen letters get 0.01 occurrences
+            ngrams = {}
+            for _ in range(header[1]):
+                size = array.array('Q')
+                size.fromfile(file, 1)
+                n = size[0]
+                counts = array.array('Q')
+                counts.fromfile(file, 26 ** n)
+                ngrams[n] = _ngram_model_from_counts(counts, n)
+    except (OSError, EOFError, ValueError, OverflowError, MemoryError):
+        return None
+    return {'name': language, 'unigram': unigram, 'ngrams': ngrams}
+
+'______________________________________________________________________________'
+
 def file_to_text(filename):
     """
     ----------------------------------------------------
@@ -165,8 +556,8 @@ def file_to_text(filename):
     """
     assert is_valid_filename(filename), ASSERTION; #assertion check valid file name
     
-    file = open(filename, "r"); #open file with read permissions
-    contents = file.read(); #read contents of file to return variable
+    with open(filename, "r") as file: #open file with read permissions
+        contents = file.read(); #read contents of file to return variable
     
     return contents;
 
@@ -186,12 +577,81 @@ def text_to_file(text, filename):
     assert is_valid_filename(filename), ASSERTION; #assertion check valid file name
     assert type(text) == str, ASSERTION; #assertion check valid file name
     
-    file = open(filename, "w");#open file with write permissions
-    file.write(text);#write contents of string to file
+    with open(filename, "w") as file:#open file with write permissions
+        file.write(text);#write contents of string to file
     return;
 
 '______________________________________________________________________________'
 
+def encrypt_file(src, dst, cipher, chunk_size=CHUNK_SIZE):
+    """
+    ----------------------------------------------------
+    Parameters:   src (str): plaintext filename
+                  dst (str): ciphertext filename (overwritten)
+                  cipher: cipher object with an encrypt_chunks method
+                      (Shift, Vigenere, Alberti, Block_Rotate)
+                  chunk_size (int): characters read at a time, default = CHUNK_SIZE
+    Return:       count (int): number of characters written
+    Description:  Encrypts a file of any size with bounded memory
+                  The file is read in chunks, the cipher carries its state
+                      (key phase, wheel rotation, partial block) between chunks
+                  Output is the same as encrypting the whole file at once
+                  Line endings are kept as is, undecodable bytes are passed through
+    Errors:       if cipher does not support streaming:
+                      print 'Error(encrypt_file): unsupported cipher' and return 0
+    ---------------------------------------------------
+    """
+    if not hasattr(cipher, 'encrypt_chunks'):
+        print('Error(encrypt_file): unsupported cipher')
+        return 0
+    return _stream_file(src, dst, cipher.encrypt_chunks, chunk_size)
+
+'______________________________________________________________________________'
+
+def decrypt_file(src, dst, cipher, chunk_size=CHUNK_SIZE):
+    """
+    ----------------------------------------------------
+    Parameters:   src (str): ciphertext filename
+                  dst (str): plaintext filename (overwritten)
+                  cipher: cipher object with a decrypt_chunks method
+                      (Shift, Vigenere, Alberti, Block_Rotate)
+                  chunk_size (int): characters read at a time, default = CHUNK_SIZE
+    Return:       count (int): number of characters written
+    Description:  Decrypts a file of any size with bounded memory (see encrypt_file)
+    Errors:       if cipher does not support streaming:
+                      print 'Error(decrypt_file): unsupported cipher' and return 0
+    ---------------------------------------------------
+    """
+    if not hasattr(cipher, 'decrypt_chunks'):
+        print('Error(decrypt_file): unsupported cipher')
+        return 0
+    return _stream_file(src, dst, cipher.decrypt_chunks, chunk_size)
+
+'______________________________________________________________________________'
+
+def _stream_file(src, dst, process, chunk_size):
+    """
+    ----------------------------------------------------
+    Parameters:   src (str), dst (str): filenames
+                  process (function): generator of output chunks from input chunks
+                  chunk_size (int)
+    Return:       count (int): number of characters written
+    Description:  Private helper of encrypt_file and decrypt_file
+    Asserts:      chunk_size is a positive integer
+    ---------------------------------------------------
+    """
+    assert type(chunk_size) == int and chunk_size > 0, ASSERTION
+    count = 0
+    with open(src, "r", encoding="utf-8", errors="surrogateescape", newline="") as infile, \
+         open(dst, "w", encoding="utf-8", errors="surrogateescape", newline="") as outfile:
+        chunks = iter(lambda: infile.read(chunk_size), "")
+        for output in process(chunks):
+            outfile.write(output)
+            count += len(output)
+    return count
+
+'______________________________________________________________________________'
+
 def is_valid_filename(filename):
     """
     ----------------------------------------------------
@@ -274,6 +734,300 @@ def load_dictionary(dict_file=None):
 
 '______________________________________________________________________________'
 
+def load_dictionary_set(dict_file=None):
+    """
+    ----------------------------------------------------
+    Parameters:   dict_file (str): filename
+                        default value = None
+    Return:       dict_set (frozenset)
+    Description:  Reads a given dictionary file into a hashed set of words
+                  dictionary is assumed to be formatted as each word in a separate line
+                  Lookups are O(1), unlike the 2D list of load_dictionary
+                  which is scanned linearly for every word
+                  if no parameter given, use default file (DICT_FILE)
+    Errors:       if invalid filename, print error msg, return empty frozenset
+    ---------------------------------------------------
+    """
+    if dict_file == None:
+        dict_file = DICT_FILE
+
+    if is_valid_filename(dict_file) == False:
+        print('Error(load_dictionary_set): invalid filename')
+        return frozenset()
+
+    with open(dict_file, "r", encoding="ISO-8859-15") as file:
+        dict_set = frozenset(word.strip() for word in file if word.strip() != "")
+    return dict_set
+
+'______________________________________________________________________________'
+
+def dict_list_to_set(dict_list):
+    """
+    ----------------------------------------------------
+    Parameters:   dict_list (list): 2D list (generated by load_dictionary)
+    Return:       dict_set (frozenset)
+    Description:  Compatibility adapter for the 2D list dictionary format
+                  Flattens all 26 letter lists into one hashed set of words
+                  The set is not cached, as the caller may edit the list: to check
+                      many texts, convert it once and pass the set instead
+    Asserts:      dict_list is a list
+    ---------------------------------------------------
+    """
+    assert type(dict_list) == list, ASSERTION
+    return frozenset(word for letter_list in dict_list for word in letter_list)
+
+'______________________________________________________________________________'
+
+def compile_dictionary(dict_file, snapshot_file):
+    """
+    ----------------------------------------------------
+    Parameters:   dict_file (str): filename of a text dictionary
+                  snapshot_file (str): filename of the binary output
+    Return:       count (int): number of words written
+    Description:  Compiles a text dictionary (one word per line) into a binary snapshot
+                  that load_dictionary_snapshot can memory map
+                  Layout (native byte order):
+                      magic (4 bytes), version (uint32), #words (uint32)
+                      offsets: #words+1 uint32 offsets into the word block
+                      word block: sorted words encoded in ISO-8859-15
+                  Duplicate and empty lines are dropped
+    Errors:       if invalid dictionary, print error msg, return 0
+    ---------------------------------------------------
+    """
+    dict_set = load_dictionary_set(dict_file)
+    if len(dict_set) == 0:
+        print('Error(compile_dictionary): empty or invalid dictionary')
+        return 0
+
+    words = sorted(word.encode("ISO-8859-15") for word in dict_set)
+    offsets = array.array('I', [0])
+    total = 0
+    for word in words:
+        total += len(word)
+        offsets.append(total)
+    header = array.array('I', [SNAPSHOT_VERSION, len(words)])
+
+    with open(snapshot_file, "wb") as file:
+        file.write(SNAPSHOT_MAGIC)
+        header.tofile(file)
+        offsets.tofile(file)
+        file.write(b"".join(words))
+    return len(words)
+
+'______________________________________________________________________________'
+
+class Dictionary_Snapshot:
+    """
+    ----------------------------------------------------
+    Description: Read-only dictionary backed by a memory mapped snapshot
+                 (generated by compile_dictionary)
+                 Pages are shared by every process that maps the same file
+                 Supports 'word in snapshot' (binary search) and len()
+    ----------------------------------------------------
+    """
+    def __init__(self, snapshot_file):
+        """
+        ----------------------------------------------------
+        Parameters:   snapshot_file (str)
+        Description:  Dictionary_Snapshot constructor
+                      maps the file and validates its header
+        Errors:       raises ValueError if the file is not a valid snapshot:
+                          wrong magic or version, or a file length that does
+                          not match the header and the offset table (truncated)
+        ---------------------------------------------------
+        """
+        with open(snapshot_file, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        size = array.array('I').itemsize
+        start = len(SNAPSHOT_MAGIC)
+        if len(self._map) < start + 2 * size or self._map[:start] != SNAPSHOT_MAGIC:
+            self._map.close()
+            raise ValueError('invalid dictionary snapshot')
+        header = memoryview(self._map)[start:start + 2 * size].cast('I')
+        version, self._count = header[0], header[1]
+        header.release()
+
+        start += 2 * size
+        self._words = start + (self._count + 1) * size
+        if version != SNAPSHOT_VERSION or self._words > len(self._map):
+            self._map.close()
+            raise ValueError('invalid dictionary snapshot')
+        self._offsets = memoryview(self._map)[start:self._words].cast('I')
+        if self._offsets[0] != 0 or self._offsets[self._count] != len(self._map) - self._words:
+            self.close()
+            raise ValueError('invalid dictionary snapshot')
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, word):
+        """
+        ----------------------------------------------------
+        Parameters:   word (str)
+        Return:       True/False
+        Description:  Binary search of word in the sorted word block
+        ---------------------------------------------------
+        """
+        try:
+            key = word.encode("ISO-8859-15")
+        except (AttributeError, UnicodeEncodeError):
+            return False
+
+        low = 0
+        high = self._count
+        while low < high:
+            mid = (low + high) // 2
+            item = self._map[self._words + self._offsets[mid]:self._words + self._offsets[mid + 1]]
+            if item < key:
+                low = mid + 1
+            elif item > key:
+                high = mid
+            else:
+                return True
+        return False
+
+    def close(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       -
+        Description:  Releases the memory map
+        ---------------------------------------------------
+        """
+        self._offsets.release()
+        self._map.close()
+
+'______________________________________________________________________________'
+
+def load_dictionary_snapshot(snapshot_file):
+    """
+    ----------------------------------------------------
+    Parameters:   snapshot_file (str)
+    Return:       snapshot (Dictionary_Snapshot)
+    Description:  Memory maps a dictionary snapshot (generated by compile_dictionary)
+                  No parsing is done, words are read from the mapped pages on lookup
+    Errors:       if invalid snapshot, print error msg, return empty frozenset
+    ---------------------------------------------------
+    """
+    try:
+        snapshot = Dictionary_Snapshot(snapshot_file)
+    except (OSError, ValueError):
+        print('Error(load_dictionary_snapshot): invalid snapshot')
+        snapshot = frozenset()
+    return snapshot
+
+'______________________________________________________________________________'
+
+def is_dictionary_snapshot(filename):
+    """
+    ----------------------------------------------------
+    Parameters:   filename (str)
+    Return:       True/False
+    Description:  Checks if given file starts with the snapshot magic bytes
+    ---------------------------------------------------
+    """
+    if type(filename) != str or not os.path.isfile(filename):
+        return False
+    with open(filename, "rb") as file:
+        return file.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+'______________________________________________________________________________'
+
+def open_dictionary(dict_file=None):
+    """
+    ----------------------------------------------------
+    Parameters:   dict_file (str): text dictionary or snapshot filename
+                        default value = None
+    Return:       dictionary (frozenset or Dictionary_Snapshot)
+    Description:  Loads a dictionary for analyze_text and is_plaintext
+                  Snapshots are memory mapped, text files are read into a set
+                  if no parameter given, use default file (DICT_FILE)
+    ---------------------------------------------------
+    """
+    if dict_file == None:
+        dict_file = DICT_FILE
+    if is_dictionary_snapshot(dict_file):
+        return load_dictionary_snapshot(dict_file)
+    return load_dictionary_set(dict_file)
+
+'______________________________________________________________________________'
+
+def get_dictionary(dict_file=None):
+    """
+    ----------------------------------------------------
+    Parameters:   dict_file (str): text dictionary or snapshot filename
+                        default value = None
+    Return:       dictionary (frozenset or Dictionary_Snapshot)
+    Description:  Process-wide cached version of open_dictionary
+                  Each file is loaded once and kept in memory
+                  The file is reloaded if its size or modification time changed,
+                      a replaced snapshot stays valid for callers that still
+                      hold it and is unmapped when its last reference is dropped
+                  Hits and misses are counted (see get_dictionary_stats)
+                  if no parameter given, use default file (DICT_FILE)
+    Errors:       files that cannot be found are not cached,
+                      they are passed on to open_dictionary
+    ---------------------------------------------------
+    """
+    if dict_file == None:
+        dict_file = DICT_FILE
+    try:
+        stat = os.stat(dict_file)
+    except OSError:
+        return open_dictionary(dict_file)
+
+    filename = os.path.abspath(dict_file)
+    with _dict_cache_lock:
+        entry = _dict_cache.get(filename)
+        if entry != None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            _dict_cache_stats['hits'] += 1
+            return entry[2]
+        _dict_cache_stats['misses'] += 1
+
+        dictionary = open_dictionary(dict_file)
+        if len(dictionary) > 0:
+            _dict_cache[filename] = [stat.st_size, stat.st_mtime_ns, dictionary]
+        elif entry != None:
+            del _dict_cache[filename]
+    return dictionary
+
+'______________________________________________________________________________'
+
+def get_dictionary_stats():
+    """
+    ----------------------------------------------------
+    Parameters:   -
+    Return:       stats (dict): hits, misses and entries
+    Description:  Returns a copy of the get_dictionary cache counters
+                  entries is the number of dictionaries currently cached
+    ---------------------------------------------------
+    """
+    with _dict_cache_lock:
+        stats = dict(_dict_cache_stats)
+        stats['entries'] = len(_dict_cache)
+    return stats
+
+'______________________________________________________________________________'
+
+def clear_dictionary_cache():
+    """
+    ----------------------------------------------------
+    Parameters:   -
+    Return:       -
+    Description:  Drops all dictionaries cached by get_dictionary
+                  and resets the hit/miss counters
+                  Snapshots still held by callers stay usable
+    ---------------------------------------------------
+    """
+    with _dict_cache_lock:
+        _dict_cache.clear()
+        _dict_cache_stats['hits'] = 0
+        _dict_cache_stats['misses'] = 0
+    return
+
+'______________________________________________________________________________'
+
 def text_to_words(text):
     """
     ----------------------------------------------------
@@ -299,19 +1053,25 @@ def analyze_text(text, dict_list):
     """
     ----------------------------------------------------
     Parameters:   text (str)
-                  dict_list (list)
+                  dict_list (list/set): 2D list (load_dictionary),
+                      set of words (load_dictionary_set)
+                      or Dictionary_Snapshot (load_dictionary_snapshot)
     Return:       matches (int)
                   mismatches (int)
     Description:  Reads a given text, checks if each word appears in given dictionary
                   Returns number of matches and mismatches.
                   Words are compared in lowercase
+                  A 2D list is converted to a set once, lookups are hashed
                   Assumes a proper dict_list
-    Asserts:      text is a string and dict_list is a list
+    Asserts:      text is a string and dict_list is a list, a set or a snapshot
     ---------------------------------------------------
     """
-    assert type(dict_list) == list, ASSERTION; #assertion check valid file name
+    assert type(dict_list) in (list, set, frozenset, Dictionary_Snapshot), ASSERTION; #assertion check valid dictionary
     assert type(text) == str, ASSERTION; #assertion check valid file name
     
+    if type(dict_list) == list:
+        dict_list = dict_list_to_set(dict_list)
+    
     matches = 0; #return variables for number of matches and mismatches
     mismatches = 0;
     
@@ -326,7 +1086,7 @@ def analyze_text(text, dict_list):
             if (index > 26 or index < 0): #if its not a letter its a mismatch
                 mismatches += 1;
                 continue;#dont run the next if statement
-            if (word.lower() in dict_list[index]):#if word in dictionary increase matches
+            if (word.lower() in dict_list):#if word in dictionary increase matches
                 matches += 1;
             else: mismatches += 1;#otherwise increase mismatches
             
@@ -335,33 +1095,315 @@ def analyze_text(text, dict_list):
 
 '______________________________________________________________________________'
 
-def is_plaintext(text, dict_list, threshold=0.9):
+def is_plaintext(text, dict_list, threshold=0.9, sample_size=0):
     """
     ----------------------------------------------------
     Parameters:   text (str)
-                  dict_list (list): dictionary list
+                  dict_list (list/set): dictionary list, set of words or snapshot
                   threshold (float): number between 0 to 1
                       default value = 0.9
+                  sample_size (int): default = 0 (check all words)
     Return:       True/False
     Description:  Check if a given file is a plaintext
                   If #matches/#words >= threshold --> True
                       otherwise --> False
                   If invalid threshold, set to default value of 0.9
                   An empty text should return False
+                  Stops as soon as the result is decided (see detect_plaintext)
+                  If sample_size > 0, decides from a sample of the words
+                      when the sample is far enough from threshold (see sample_plaintext)
                   Assumes a valid dict_list is passed
     ---------------------------------------------------
     """
-    myvalue = True
-    matches = analyze_text(text, dict_list)[0];
-    word_count = len(text_to_words(text));
-    
-    if text == "" or matches/word_count < threshold:
-        myvalue = False
-    return myvalue
+    if sample_size > 0:
+        return sample_plaintext(text, dict_list, threshold, sample_size)[0]
+    return detect_plaintext(text, dict_list, threshold)[0]
         
 
 '______________________________________________________________________________'
 
+def detect_plaintext(text, dict_list, threshold=0.9):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  dict_list (list/set): dictionary list, set of words or snapshot
+                  threshold (float): number between 0 to 1
+                      default value = 0.9
+    Return:       is_plain (bool): #matches/#words >= threshold
+                  examined (int): number of words checked against dict_list
+    Description:  Early-exit version of is_plaintext
+                  Text is split once, words are stripped and matched lazily
+                  Stops as soon as the threshold is guaranteed to be reached
+                      or can no longer be reached by the remaining words
+                  Words are matched with the same rules as analyze_text
+                  An empty text should return False
+    Asserts:      text is a string and dict_list is a list, a set or a snapshot
+    ---------------------------------------------------
+    """
+    assert type(dict_list) in (list, set, frozenset, Dictionary_Snapshot), ASSERTION
+    assert type(text) == str, ASSERTION
+
+    if type(dict_list) == list:
+        dict_list = dict_list_to_set(dict_list)
+
+    words = text.split()
+    if len(words) == 0:
+        return False, 0
+    is_plain, examined, _ = _scan_words(words, dict_list, threshold)
+    return is_plain, examined
+
+'______________________________________________________________________________'
+
+def sample_plaintext(text, dict_list, threshold=0.9, sample_size=SAMPLE_SIZE, confidence=0.99, seed=0):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  dict_list (list/set): dictionary list, set of words or snapshot
+                  threshold (float): number between 0 to 1
+                      default value = 0.9
+                  sample_size (int): number of sampled words, default = SAMPLE_SIZE
+                  confidence (float): confidence of the bound, default = 0.99
+                  seed (int): seed of the sampler, default = 0 (repeatable results)
+    Return:       is_plain (bool)
+                  low (float), high (float): bounds on #matches/#words
+                  examined (int): number of words checked against dict_list
+    Description:  Sampling version of detect_plaintext for long texts
+                  Splits the words into sample_size equal strata
+                      and checks one random word from each stratum
+                  The bound is the Hoeffding interval: ratio +- sqrt(ln(2/(1-confidence))/(2n))
+                  If the whole interval is on one side of threshold, that decides
+                  Otherwise (or if the text has few words) escalates to detect_plaintext
+                      and the bounds are the exact ones known when it stopped
+    Asserts:      text is a string and dict_list is a list, a set or a snapshot
+                  sample_size is a positive integer, 0 < confidence < 1
+    ---------------------------------------------------
+    """
+    assert type(dict_list) in (list, set, frozenset, Dictionary_Snapshot), ASSERTION
+    assert type(text) == str, ASSERTION
+    assert type(sample_size) == int and sample_size > 0, ASSERTION
+    assert 0 < confidence < 1, ASSERTION
+
+    if type(dict_list) == list:
+        dict_list = dict_list_to_set(dict_list)
+
+    words = text.split()
+    word_count = len(words)
+    if word_count == 0:
+        return False, 0.0, 0.0, 0
+
+    if word_count > 2 * sample_size:
+        rand = random.Random(seed)
+        sample = [words[rand.randrange(i * word_count // sample_size, (i+1) * word_count // sample_size)]
+                  for i in range(sample_size)]
+        ratio = _scan_words(sample, dict_list, None)[2] / sample_size
+        margin = math.sqrt(math.log(2 / (1 - confidence)) / (2 * sample_size))
+        low = max(0.0, ratio - margin)
+        high = min(1.0, ratio + margin)
+        if low >= threshold or high < threshold:
+            return low >= threshold, low, high, sample_size
+        examined = sample_size
+    else:
+        examined = 0
+
+    is_plain, scanned, matches = _scan_words(words, dict_list, threshold)
+    low = matches / word_count
+    high = (matches + word_count - scanned) / word_count
+    return is_plain, low, high, examined + scanned
+
+'______________________________________________________________________________'
+
+def _scan_words(words, dict_set, threshold):
+    """
+    ----------------------------------------------------
+    Parameters:   words (list): non-empty list of words (str.split)
+                  dict_set (set or Dictionary_Snapshot)
+                  threshold (float): None to match every word
+    Return:       is_plain (bool), examined (int), matches (int)
+    Description:  Private helper of detect_plaintext and sample_plaintext
+                  Matches words in order and stops once
+                      #matches/#words >= threshold is decided
+    ---------------------------------------------------
+    """
+    word_count = len(words)
+    matches = 0
+    examined = 0
+    for word in words:
+        if threshold != None:
+            if matches / word_count >= threshold:
+                return True, examined, matches
+            if (matches + word_count - examined) / word_count < threshold:
+                return False, examined, matches
+
+        examined += 1
+        word = word.strip(SCHAR)
+        if word != "":
+            index = ord(word[0].lower()) - 97
+            if index >= 0 and index <= 26 and word.lower() in dict_set:
+                matches += 1
+
+    if threshold == None:
+        return False, examined, matches
+    return matches / word_count >= threshold, examined, matches
+
+'______________________________________________________________________________'
+
+def dictionary_scorer(dict_list):
+    """
+    ----------------------------------------------------
+    Parameters:   dict_list (list/set): dictionary list, set of words or snapshot
+    Return:       scorer (function): text --> #matches/#words (0 for empty text)
+    Description:  Fitness function for ranking candidates by dictionary words
+                  Words are matched with the same rules as is_plaintext
+    Asserts:      dict_list is a list, a set or a snapshot
+    ---------------------------------------------------
+    """
+    assert type(dict_list) in (list, set, frozenset, Dictionary_Snapshot), ASSERTION
+    if type(dict_list) == list:
+        dict_list = dict_list_to_set(dict_list)
+
+    def scorer(text):
+        words = text.split()
+        if len(words) == 0:
+            return 0
+        return _scan_words(words, dict_list, None)[2] / len(words)
+    return scorer
+
+'______________________________________________________________________________'
+
+class Candidate_List:
+    """
+    ----------------------------------------------------
+    Description: Top k cryptanalysis candidates, ranked by score (higher is better)
+                 Candidates are kept in a bounded heap, so memory does not
+                     grow with the number of keys tried
+                 Plaintext is only decrypted when it is read, unless it
+                     was already known when the candidate was added
+                 On equal score, the first added candidate ranks higher,
+                     or the last one if prefer_last is set
+    ----------------------------------------------------
+    """
+    __slots__ = ('_k', '_decrypt', '_prefer_last', '_heap', '_count', '_ranked')
+
+    def __init__(self, k, decrypt=None, prefer_last=False):
+        """
+        ----------------------------------------------------
+        Parameters:   k (int): number of candidates to keep
+                      decrypt (function): key --> plaintext, default = None
+                      prefer_last (bool): default = False
+        Description:  Candidate_List constructor
+        Asserts:      k is a positive integer
+        ---------------------------------------------------
+        """
+        assert type(k) == int and k > 0, ASSERTION
+        self._k = k
+        self._decrypt = decrypt
+        self._prefer_last = prefer_last
+        self._heap = [] #[score, order, key, plaintext], worst candidate first
+        self._count = 0
+        self._ranked = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __str__(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       output (str)
+        Description:  One line per candidate: <rank>: key = <key>, score = <score>
+        ---------------------------------------------------
+        """
+        return "\n".join("{}: key = {}, score = {}".format(i + 1, key, score)
+                         for i, (key, score) in enumerate(self.get_candidates()))
+
+    def add(self, score, key, plaintext=None):
+        """
+        ----------------------------------------------------
+        Parameters:   score (float): higher is better
+                      key: cipher key of the candidate
+                      plaintext (str): default = None (decrypt when read)
+        Return:       -
+        Description:  Adds a candidate, the worst one is dropped if more than k
+        ---------------------------------------------------
+        """
+        self._count += 1
+        order = self._count if self._prefer_last else -self._count
+        entry = [score, order, key, plaintext]
+        if len(self._heap) < self._k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            return
+        self._ranked = None
+        return
+
+    def _get_ranked(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       entries (list): best candidate first
+        Description:  Private helper, sorts the heap once after changes
+        ---------------------------------------------------
+        """
+        if self._ranked == None:
+            self._ranked = sorted(self._heap, reverse=True)
+        return self._ranked
+
+    def get_candidates(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       candidates (list): [(key, score), ...] best first
+        Description:  Does not decrypt any candidate
+        ---------------------------------------------------
+        """
+        return [(entry[2], entry[0]) for entry in self._get_ranked()]
+
+    def get_key(self, i=0):
+        """
+        ----------------------------------------------------
+        Parameters:   i (int): rank, default = 0 (best)
+        Return:       key
+        ---------------------------------------------------
+        """
+        return self._get_ranked()[i][2]
+
+    def get_score(self, i=0):
+        """
+        ----------------------------------------------------
+        Parameters:   i (int): rank, default = 0 (best)
+        Return:       score (float)
+        ---------------------------------------------------
+        """
+        return self._get_ranked()[i][0]
+
+    def get_plaintext(self, i=0):
+        """
+        ----------------------------------------------------
+        Parameters:   i (int): rank, default = 0 (best)
+        Return:       plaintext (str)
+        Description:  Decrypts the candidate on first read, then keeps the text
+        ---------------------------------------------------
+        """
+        entry = self._get_ranked()[i]
+        if entry[3] == None:
+            entry[3] = self._decrypt(entry[2])
+        return entry[3]
+
+    def get_best(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       key, plaintext: best candidate, ('','') if empty
+        ---------------------------------------------------
+        """
+        if len(self._heap) == 0:
+            return '',''
+        return self.get_key(0), self.get_plaintext(0)
+
+'______________________________________________________________________________'
+
 def new_matrix(r,c,fill):
     """
     ----------------------------------------------------
@@ -493,24 +1535,17 @@ def get_positions(text,base):
                   Example: get_positions('I have 3 cents.','c.h') -->
                       [['h',2],['c',9],['.',14]]
                   items are ordered based on their occurrence in the text
+                  For large texts use mask_text, which stores positions compactly
     Asserts:      text and base are strings
     ---------------------------------------------------
     """
     assert type(text) == str, ASSERTION; #assertion check valid file name
     assert type(base) == str, ASSERTION; #assertion check valid file name
     
-    positions = []
-    i = -1;
-    for letter in text:
-        i += 1;
-        if letter not in base:
-            continue;
-        else:
-            temp = []
-            temp.append(letter)
-            temp.append(i)
-            positions.append(temp)
-            
+    if base == "":
+        return []
+    pattern = make_alphabet(base).get_pattern()
+    positions = [[match.group(), match.start()] for match in pattern.finditer(text)]
 
     return positions
 
@@ -524,19 +1559,14 @@ def clean_text(text,base):
     Return:       updated_text (str)
     Description:  Constructs and returns a new text which has
                   all characters in original text after removing base characters
+                  Done in one str.translate call
     Asserts:      text and base are strings
     ---------------------------------------------------
     """
     assert type(text) == str, ASSERTION; #assertion check valid file name
     assert type(base) == str, ASSERTION; #assertion check valid file name
     
-    updated_text = "";
-    
-    i = -1;
-    for letter in text:
-        i += 1;
-        if letter not in base:
-            updated_text += letter
+    updated_text = text.translate(make_alphabet(base).get_table())
     
     return updated_text
 
@@ -550,6 +1580,7 @@ def insert_positions(text, positions):
     Return:       updated_text (str)
     Description:  Inserts all characters in the positions 2D list (generated by get_positions)
                   into their respective locations
+                  Text between insertions is copied as slices and joined once
                   Assumes a valid positions 2d list is given
     Asserts:      text is a string and positions is a list
     ---------------------------------------------------
@@ -557,23 +1588,141 @@ def insert_positions(text, positions):
     assert type(text) == str, ASSERTION; #assertion check valid file name
     assert type(positions) == list, ASSERTION; #assertion check valid file name
     
-    updated_text = "";
-    
-    i = 0;
-    j = 0;
-    for item in positions:
-        while(item[1] != i):
-            updated_text += text[j]
-            j+=1
-            i+=1
-        updated_text += item[0];
-        i+=1
-    while j < len(text):
-        updated_text+= text[j]
-        j+=1
+    return _insert(text, [item[0] for item in positions], [item[1] for item in positions])
 
-    
-    return updated_text
+'______________________________________________________________________________'
+
+def _insert(text, chars, positions):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  chars (str/list): characters to insert
+                  positions (list/array): ascending positions in the output text
+    Return:       updated_text (str)
+    Description:  Private helper of insert_positions and Mask.insert
+                  Linear time: text is copied in slices between insertions
+    ---------------------------------------------------
+    """
+    pieces = []
+    j = 0 #next character of text
+    i = 0 #length of output so far
+    for char, pos in zip(chars, positions):
+        pieces.append(text[j:j + pos - i])
+        pieces.append(char)
+        j += pos - i
+        i = pos + 1
+    pieces.append(text[j:])
+    return "".join(pieces)
+
+'______________________________________________________________________________'
+
+class Mask:
+    """
+    ----------------------------------------------------
+    Description: Record of the characters removed from a text (see mask_text)
+                 Stores the removed characters as one string and their
+                     positions as an array of integers, instead of
+                     the [[char,pos],...] lists of get_positions
+                 insert(text) puts the characters back into their positions
+    ----------------------------------------------------
+    """
+    __slots__ = ('_chars', '_positions', '_length')
+
+    def __init__(self, chars, positions, length):
+        """
+        ----------------------------------------------------
+        Parameters:   chars (str): removed characters in order
+                      positions (array): position of each removed character
+                      length (int): length of the original text
+        Description:  Mask constructor, use mask_text to create masks
+        ---------------------------------------------------
+        """
+        self._chars = chars
+        self._positions = positions
+        self._length = length
+
+    def __len__(self):
+        return len(self._chars)
+
+    def get_length(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       length (int): length of the original text
+        ---------------------------------------------------
+        """
+        return self._length
+
+    def get_positions(self):
+        """
+        ----------------------------------------------------
+        Parameters:   -
+        Return:       positions (2D list): same format as get_positions
+        ---------------------------------------------------
+        """
+        return [[self._chars[i], self._positions[i]] for i in range(len(self._chars))]
+
+    def insert(self, text):
+        """
+        ----------------------------------------------------
+        Parameters:   text (str)
+        Return:       updated_text (str)
+        Description:  Inserts the removed characters back into their positions
+                      text longer than the stripped text is kept at the end
+        Asserts:      text is a string
+        ---------------------------------------------------
+        """
+        assert type(text) == str, ASSERTION
+        return _insert(text, self._chars, self._positions)
+
+'______________________________________________________________________________'
+
+def mask_text(text, base):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  base (str): characters to remove
+    Return:       updated_text (str): text without base characters
+                  mask (Mask): removed characters and their positions
+    Description:  Combined clean_text and get_positions with compact storage
+                  mask.insert(updated_text) gives back the original text
+                  Example: mask_text('a\nb\n','\n') --> 'ab', mask
+                      mask.insert('xy') --> 'x\ny\n'
+    Asserts:      text and base are strings
+    ---------------------------------------------------
+    """
+    assert type(text) == str, ASSERTION
+    assert type(base) == str, ASSERTION
+
+    positions = array.array('q')
+    chars = ""
+    alphabet = make_alphabet(base)
+    pattern = alphabet.get_pattern()
+    if pattern != None:
+        matches = pattern.finditer(text)
+        positions.extend(match.start() for match in matches)
+        chars = "".join(text[pos] for pos in positions)
+    return text.translate(alphabet.get_table()), Mask(chars, positions, len(text))
+
+'______________________________________________________________________________'
+
+def mask_letters(text):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+    Return:       letters (str): English letters of text (A-Z and a-z)
+                  mask (Mask): all other characters and their positions
+    Description:  Same as mask_text, but keeps the letters instead of
+                      removing a given base, so any other character
+                      (including non-English letters) goes to the mask
+                  mask.insert(letters) gives back the original text
+    Asserts:      text is a string
+    ---------------------------------------------------
+    """
+    assert type(text) == str, ASSERTION
+    positions = array.array('q', (match.start() for match in _NOT_LETTER.finditer(text)))
+    chars = "".join(text[pos] for pos in positions)
+    return _NOT_LETTER.sub("", text), Mask(chars, positions, len(text))
 
 '______________________________________________________________________________'
 
@@ -593,25 +1742,12 @@ def text_to_blocks(text,b_size,padding = False,pad =PAD):
     """
     assert type(text) == str, ASSERTION; #assertion check valid file name
     assert type(b_size) == int and b_size >0, ASSERTION; #assertion check valid file name
-    i = 0;
-    blocks = []
-    temp = ""
-    for i in range(len(text)):
-
-        if ((i+1)%b_size == 0 and i > 0):
-            temp+= text[i]
-            blocks.append(temp)
-            temp = ""
-        else:
-            temp+= text[i]
+    blocks = [text[i:i+b_size] for i in range(0, len(text), b_size)]
             
-    if(len(temp) > 0):
-        if padding == True:
-            while len(temp)<b_size:
-                temp+=pad
-        blocks.append(temp)
+    if len(blocks) > 0 and len(blocks[-1]) < b_size and padding == True and pad != "":
+        missing = b_size - len(blocks[-1])
+        blocks[-1] += pad * (-(-missing // len(pad)))
             
-        
     return blocks
 
 '______________________________________________________________________________'
@@ -623,27 +1759,68 @@ def blocks_to_baskets(blocks):
     Return:       baskets: (list): list of equal size strings
     Description:  Create k baskets, where k = block_size
                   basket[i] contains the ith character from each block
+                  To go from a text to baskets directly, use get_baskets
     Errors:       if blocks are not strings or are of different sizes -->
                     print 'Error(blocks_to_baskets): invalid blocks', return []
     ----------------------------------------------------
     """
     size = len(str(blocks[0]))
     
-    baskets = ["" for _ in range(size)]
-           
-    
     for word in blocks:
         if type(blocks) != list or type(word) != str or len(word) != size:
             print("Error(blocks_to_baskets): invalid blocks")
-            baskets = []
-            break;
-        else:
-            for i in range(size):
-                baskets[i] += word[i]
+            return []
+    
+    text = "".join(blocks)
+    baskets = [text[i::size] for i in range(size)]
     return baskets            
 
 '______________________________________________________________________________'
 
+def get_baskets(text, k, padding = False, pad = PAD):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  k (int): number of baskets (block size)
+                  padding (bool): False(default) = no padding, True = padding
+                  pad (str): padding character, default = PAD
+    Return:       baskets (list): k strings
+    Description:  Same baskets as blocks_to_baskets(text_to_blocks(text,k,padding,pad))
+                  without building the blocks: basket i is the slice text[i::k]
+                  Without padding, the last baskets may be one character shorter
+    Asserts:      text is a string and k is a positive integer
+    ---------------------------------------------------
+    """
+    assert type(text) == str, ASSERTION
+    assert type(k) == int and k > 0, ASSERTION
+    
+    baskets = [text[i::k] for i in range(k)]
+    filled = len(text) % k #baskets that got a character from the last block
+    if padding == True and filled != 0:
+        for i in range(filled, k):
+            baskets[i] += pad
+    return baskets
+
+'______________________________________________________________________________'
+
+def get_baskets_range(text, k0, kn, padding = False, pad = PAD):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  k0 (int): smallest number of baskets
+                  kn (int): largest number of baskets (inclusive)
+                  padding (bool): False(default) = no padding, True = padding
+                  pad (str): padding character, default = PAD
+    Return:       baskets (dict): k --> get_baskets(text,k,padding,pad)
+    Description:  Baskets for every block size from k0 to kn in one call
+    Asserts:      text is a string and 0 < k0 <= kn
+    ---------------------------------------------------
+    """
+    assert type(k0) == int and type(kn) == int and 0 < k0 <= kn, ASSERTION
+    return {k: get_baskets(text, k, padding, pad) for k in range(k0, kn + 1)}
+
+'______________________________________________________________________________'
+
 def compare_texts(text1,text2):
     """
     ----------------------------------------------------
@@ -671,6 +1848,59 @@ def compare_texts(text1,text2):
 
 '______________________________________________________________________________'
 
+def coincidence_counts(text, max_shift):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  max_shift (int): largest shift to count
+    Return:       counts (list): counts[s] = number of positions i
+                      where text[i] == text[i+s], for s in 0..max_shift
+    Description:  Autocorrelation of a text against its own shifts
+                  Same as compare_texts(" "*s + text[:-s], text) for every s
+                      when text has no spaces, but computed for all shifts at once
+                  With numpy: direct array comparisons for few shifts,
+                      otherwise one FFT per distinct character
+                  Without numpy: one bitset (int) per distinct character,
+                      counts[s] = sum of popcount(bits & (bits >> s))
+    Asserts:      text is a string and max_shift is a non-negative integer
+    ---------------------------------------------------
+    """
+    assert type(text) == str, ASSERTION
+    assert type(max_shift) == int and max_shift >= 0, ASSERTION
+    n = len(text)
+    shifts = min(max_shift, n - 1) if n > 0 else -1
+    counts = [0] * (max_shift + 1)
+    if shifts < 0:
+        return counts
+    
+    if np != None:
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        symbols, inverse = np.unique(codes, return_inverse=True)
+        size = 1 << (n + shifts).bit_length() #no circular overlap up to shifts
+        if shifts <= len(symbols) * size.bit_length():
+            values = [int(np.count_nonzero(codes[s:] == codes[:n - s])) for s in range(shifts + 1)]
+        else:
+            power = np.zeros(size // 2 + 1)
+            for k in np.flatnonzero(np.bincount(inverse) > 1):
+                spectrum = np.fft.rfft((inverse == k).astype(np.float64), size)
+                power += spectrum.real ** 2 + spectrum.imag ** 2
+            values = np.rint(np.fft.irfft(power, size)[:shifts + 1]).astype(np.int64).tolist()
+            values[0] = n
+    else:
+        table = dict.fromkeys(map(ord, set(text)), '0')
+        values = [0] * (shifts + 1)
+        for char in set(text):
+            table[ord(char)] = '1'
+            bits = int(text.translate(table)[::-1], 2) #bit i set where text[i] == char
+            table[ord(char)] = '0'
+            for s in range(shifts + 1):
+                values[s] += _popcount(bits & (bits >> s))
+    
+    counts[:shifts + 1] = values
+    return counts
+
+'______________________________________________________________________________'
+
 def get_freq(text,base = ''):
     """
     ----------------------------------------------------
@@ -680,17 +1910,244 @@ def get_freq(text,base = ''):
     Description:  Finds character frequencies (count) in a given text
                   Default is English language (counts both upper and lower case)
                   Otherwise returns frequencies of characters defined in base
+                  Text is counted in a single pass (see get_char_counts)
     Assert:       text is a string
     ----------------------------------------------------
     """
     count_list = []
     assert type(text) == str , ASSERTION
+    counts = get_char_counts(text)
     if base == None: 
-        count_list = [text.count(chr(97+i))+text.count(chr(65+i)) for i in range(26)]
+        count_list = [counts.get(chr(97+i),0)+counts.get(chr(65+i),0) for i in range(26)]
     else:
-        count_list = [text.count(char) for char in base]
+        count_list = [counts.get(char,0) for char in base]
     return count_list
 
+'______________________________________________________________________________'
+
+def get_char_counts(text):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+    Return:       counts (dict): char --> count, only for chars in text
+    Description:  Histogram of all characters of a text in one pass
+                  Large ASCII texts are counted with numpy.bincount
+                      over the encoded bytes when numpy is installed
+    Assert:       text is a string
+    ----------------------------------------------------
+    """
+    assert type(text) == str, ASSERTION
+    if np != None and len(text) >= NUMPY_MIN and text.isascii():
+        codes = np.bincount(np.frombuffer(text.encode('ascii'), dtype=np.uint8), minlength=128)
+        counts = {chr(i): int(codes[i]) for i in np.flatnonzero(codes)}
+    else:
+        counts = Counter(text)
+    return counts
+
+'______________________________________________________________________________'
+
+def get_freq_batch(texts, base = None):
+    """
+    ----------------------------------------------------
+    Parameters:   texts (list): list of strings
+                  base (str): default = None
+    Return:       count_matrix (2D numpy array or 2D list): #texts x #base chars
+    Description:  Batch version of get_freq, row i is get_freq(texts[i],base)
+                  Default is English language (26 columns, upper and lower case)
+                  With numpy, ASCII texts are counted with a single bincount
+                      and an integer numpy array is returned
+                  Without numpy, a 2D list is returned
+    Assert:       texts is a list of strings
+    ----------------------------------------------------
+    """
+    assert type(texts) == list, ASSERTION
+    for text in texts:
+        assert type(text) == str, ASSERTION
+
+    if np == None or not all(text.isascii() for text in texts):
+        count_matrix = [get_freq(text, base) for text in texts]
+        if np != None:
+            count_matrix = np.array(count_matrix, dtype=np.int64).reshape(len(texts), -1)
+        return count_matrix
+
+    lengths = [len(text) for text in texts]
+    codes = np.frombuffer("".join(texts).encode('ascii'), dtype=np.uint8).astype(np.int64)
+    codes += np.repeat(np.arange(len(texts), dtype=np.int64) * 128, lengths)
+    counts = np.bincount(codes, minlength=len(texts) * 128).reshape(len(texts), 128)
+    if base == None:
+        count_matrix = counts[:, 97:123] + counts[:, 65:91]
+    else:
+        count_matrix = np.zeros((len(texts), len(base)), dtype=counts.dtype)
+        for i in range(len(base)):
+            if ord(base[i]) < 128:
+                count_matrix[:, i] = counts[:, ord(base[i])]
+    return count_matrix
+
+
+'______________________________________________________________________________'
+
+def encode_letters(text):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+    Return:       codes (bytes): one byte (0..25) per letter
+    Description:  Integer encoding of the English letters of a text
+                  Case is ignored, all other characters are dropped
+                  Done with bytes.translate, no per-character python work
+    Assert:       text is a string
+    ----------------------------------------------------
+    """
+    assert type(text) == str, ASSERTION
+    letters = text.lower().encode('ascii', 'ignore').translate(None, _NON_LETTERS)
+    return letters.translate(_LETTER_CODES)
+
+'______________________________________________________________________________'
+
+def _ngram_indices(codes, n):
+    """
+    ----------------------------------------------------
+    Parameters:   codes (bytes): output of encode_letters
+                  n (int): n-gram length
+    Return:       indices: base-26 index of every n-gram in codes
+                      numpy array if numpy is installed, otherwise a list
+    Description:  Private helper of build_ngram_model and ngram_score
+    ----------------------------------------------------
+    """
+    count = len(codes) - n + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64) if np != None else []
+    if np != None:
+        values = np.frombuffer(codes, dtype=np.uint8).astype(np.int64)
+        indices = values[:count].copy()
+        for k in range(1, n):
+            indices = indices * 26 + values[k:count + k]
+        return indices
+    size = 26 ** n
+    indices = []
+    index = 0
+    for i in range(len(codes)):
+        index = (index * 26 + codes[i]) % size
+        if i >= n - 1:
+            indices.append(index)
+    return indices
+
+'______________________________________________________________________________'
+
+def build_ngram_model(text, n=NGRAM_SIZE):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str): training corpus
+                  n (int): n-gram length, default = NGRAM_SIZE
+    Return:       model (dict):
+                      n (int): n-gram length
+                      table: log10 probability of each n-gram (26^n entries)
+                          indexed by base 26 value ('aaaa' = 0, 'aaab' = 1, ...)
+                          numpy array if numpy is installed, otherwise array('d')
+                      floor (float): log10 probability of an unseen n-gram
+    Description:  Builds an n-gram language model from the letters of a text
+                  Unseen n-grams get the probability of 0.01 occurrences
+    Asserts:      text is a string with at least n letters, 1 <= n <= 5
+    ----------------------------------------------------
+    """
+    assert type(n) == int and 1 <= n <= 5, ASSERTION
+    codes = encode_letters(text)
+    assert len(codes) >= n, ASSERTION
+    indices = _ngram_indices(codes, n)
+
+    if np != None:
+        counts = np.bincount(indices, minlength=26 ** n)
+    else:
+        counts = [0] * (26 ** n)
+        for index in indices:
+            counts[index] += 1
+    return _ngram_model_from_counts(counts, n)
+
+'______________________________________________________________________________'
+
+def _ngram_model_from_counts(counts, n):
+    """
+    ----------------------------------------------------
+    Parameters:   counts (list/array): count of each of the 26^n n-grams
+                  n (int): n-gram length
+    Return:       model (dict): see build_ngram_model
+    Description:  Private helper, converts n-gram counts to log10 probabilities
+                  Unseen n-grams get the probability of 0.01 occurrences
+    ---------------------------------------------------
+    """
+    total = max(sum(counts) if np == None else int(np.sum(counts)), 1)
+    floor = math.log10(0.01 / total)
+    if np != None:
+        counts = np.asarray(counts, dtype=np.float64)
+        counts[counts == 0] = 0.01
+        table = np.log10(counts / total)
+    else:
+        table = array.array('d', [floor]) * (26 ** n)
+        for index in range(len(counts)):
+            if counts[index] > 0:
+                table[index] = math.log10(counts[index] / total)
+    return {'n': n, 'table': table, 'floor': floor}
+
+'______________________________________________________________________________'
+
+def ngram_score(text, model):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  model (dict): generated by build_ngram_model
+    Return:       score (float): mean n-gram log10 probability
+    Description:  Fitness of a text against a language model
+                  Higher (closer to 0) means closer to the language
+                  The sum of the log10 probabilities is divided by the number
+                      of n-grams, so texts of different lengths are comparable
+                  Letters are scored case insensitive, each digit counts as
+                      an unseen n-gram, all other characters are ignored
+                  A text without n-grams scores model['floor']
+                  With numpy, scoring is one gather and sum over the encoded text
+    ----------------------------------------------------
+    """
+    indices = _ngram_indices(encode_letters(text), model['n'])
+    digits = len(text.encode('ascii', 'ignore').translate(None, _NON_DIGITS))
+    if len(indices) + digits == 0:
+        return model['floor']
+    if np != None:
+        score = float(np.asarray(model['table'])[indices].sum())
+    else:
+        table = model['table']
+        score = sum((table[index] for index in indices), 0.0)
+    return (score + digits * model['floor']) / (len(indices) + digits)
+
+'______________________________________________________________________________'
+
+def load_ngram_model(corpus_file, n=NGRAM_SIZE):
+    """
+    ----------------------------------------------------
+    Parameters:   corpus_file (str): text file to train on
+                  n (int): n-gram length, default = NGRAM_SIZE
+    Return:       model (dict): see build_ngram_model
+    Description:  Builds an n-gram model from a file and caches it per process
+                  Later calls with the same file and n reuse the model
+    ----------------------------------------------------
+    """
+    key = (os.path.abspath(corpus_file), n)
+    if key not in _ngram_models:
+        with open(corpus_file, "r", encoding="ISO-8859-15") as file:
+            _ngram_models[key] = build_ngram_model(file.read(), n)
+    return _ngram_models[key]
+
+'______________________________________________________________________________'
+
+def get_ngram_scorer(corpus_file, n=NGRAM_SIZE):
+    """
+    ----------------------------------------------------
+    Parameters:   corpus_file (str): text file to train on
+                  n (int): n-gram length, default = NGRAM_SIZE
+    Return:       scorer (function): scorer(text) --> float, higher is better
+    Description:  Returns an n-gram fitness function that can be passed
+                  to the cryptanalyze methods of the ciphers (scorer argument)
+    ----------------------------------------------------
+    """
+    model = load_ngram_model(corpus_file, n)
+    return lambda text: ngram_score(text, model)
 
 '______________________________________________________________________________'
 
@@ -705,16 +2162,7 @@ def is_binary(b):
                   should return False
     ---------------------------------------------------
     """
-    my_val = True;
-    
-    if(type(b) is not str or b.isdigit() is False):
-        my_val = False
-    if my_val == True:
-        for bit in b:
-            if int(bit) >1 or int(bit) < 0:
-                my_val = False;
-                break;
-    return my_val;
+    return type(b) is str and b != "" and b.strip("01") == ""
 '______________________________________________________________________________'
 
 def bin_to_dec(b):
@@ -732,13 +2180,8 @@ def bin_to_dec(b):
     if (is_binary(b) == False):
         print('Error(bin_to_dec): invalid input')
         decimal = ""
-        
     else:
-        i = len(b)-1
-        for bit in b:
-            if bit == "1":
-                decimal += pow(2,i)
-            i-=1;
+        decimal = int(b, 2)
     return decimal
 
 '______________________________________________________________________________'
@@ -764,23 +2207,17 @@ def dec_to_bin(decimal,size=None):
     assert type(decimal) is int
     
     binary = ""
-    power = 0;
     if decimal == 0:
         binary = "0"
-    else:
-        while(int(decimal) > 0):
-            if decimal%2 != 0: binary = "1" + binary
-            else: binary = "0" + binary
-            power+=1;
-            decimal = int(decimal/2)
+    elif decimal > 0:
+        binary = format(decimal, 'b')
        
     if size != None: 
         if (type(size) != int or size < 1):
             print('Error(dec_to_bin): invalid size')
             binary = ""
         else:
-            while(len(binary) < size):
-                binary = "0" + binary
+            binary = binary.zfill(size)
                 
             if len(binary) > size:
                 print('Error(dec_to_bin): integer overflow')
@@ -796,6 +2233,7 @@ def xor(a,b):
                   b (str): binary number
     Return:       decimal (int)
     Description:  Apply xor operation on a and b
+                  Computed on integers, see xor_bytes for buffers
     Errors:       if a or b is not a valid binary number 
                       print 'Error(xor): invalid input' and return ''
                   if a and b have different lengths:
@@ -808,15 +2246,102 @@ def xor(a,b):
     elif (len(a) != len(b)):
         print('Error(xor): size mismatch')
     else:
-        for i in range(len(a)):
-            if ((a[i] == "1" and b[i] == "0") or (a[i] == "0" and b[i] == "1")):
-                decimal += "1"
-            else: decimal += "0"
+        decimal = format(int(a, 2) ^ int(b, 2), 'b').zfill(len(a))
     
     return decimal
 
 '______________________________________________________________________________'
 
+def bytes_to_int(data):
+    """
+    ----------------------------------------------------
+    Parameters:   data (bytes/bytearray)
+    Return:       value (int): big-endian value of data
+    Asserts:      data is bytes or bytearray
+    ---------------------------------------------------
+    """
+    assert type(data) in (bytes, bytearray), ASSERTION
+    return int.from_bytes(data, 'big')
+
+'______________________________________________________________________________'
+
+def int_to_bytes(value, size=None):
+    """
+    ----------------------------------------------------
+    Parameters:   value (int): non-negative integer
+                  size (int): number of output bytes, default = None
+    Return:       data (bytes): big-endian value
+    Description:  If no size is given, uses the smallest number of bytes (at least 1)
+    Asserts:      value is a non-negative integer
+    Errors:       if size is too small to fit value:
+                      print 'Error(int_to_bytes): integer overflow' and return b''
+    ---------------------------------------------------
+    """
+    assert type(value) is int and value >= 0, ASSERTION
+    if size == None:
+        size = max(1, (value.bit_length() + 7) // 8)
+    if value.bit_length() > 8 * size:
+        print('Error(int_to_bytes): integer overflow')
+        return b''
+    return value.to_bytes(size, 'big')
+
+'______________________________________________________________________________'
+
+def bytes_to_bin(data):
+    """
+    ----------------------------------------------------
+    Parameters:   data (bytes/bytearray)
+    Return:       binary (str): 8 bits per byte
+    Asserts:      data is bytes or bytearray
+    ---------------------------------------------------
+    """
+    assert type(data) in (bytes, bytearray), ASSERTION
+    if len(data) == 0:
+        return ""
+    return format(int.from_bytes(data, 'big'), 'b').zfill(8 * len(data))
+
+'______________________________________________________________________________'
+
+def bin_to_bytes(b):
+    """
+    ----------------------------------------------------
+    Parameters:   b (str): binary number, length is a multiple of 8
+    Return:       data (bytes)
+    Errors:       if not a valid binary number or length is not a multiple of 8:
+                      print 'Error(bin_to_bytes): invalid input' and return b''
+    ---------------------------------------------------
+    """
+    if is_binary(b) == False or len(b) % 8 != 0:
+        print('Error(bin_to_bytes): invalid input')
+        return b''
+    return int(b, 2).to_bytes(len(b) // 8, 'big')
+
+'______________________________________________________________________________'
+
+def xor_bytes(a, b):
+    """
+    ----------------------------------------------------
+    Parameters:   a (bytes/bytearray)
+                  b (bytes/bytearray)
+    Return:       result (bytes): a xor b, byte by byte
+    Description:  Bulk xor of two buffers
+                  Large buffers use numpy.bitwise_xor when numpy is installed,
+                      otherwise the buffers are xored as two integers
+    Asserts:      a and b are bytes or bytearray
+    Errors:       if a and b have different lengths:
+                      print 'Error(xor_bytes): size mismatch' and return b''
+    ---------------------------------------------------
+    """
+    assert type(a) in (bytes, bytearray) and type(b) in (bytes, bytearray), ASSERTION
+    if len(a) != len(b):
+        print('Error(xor_bytes): size mismatch')
+        return b''
+    if np != None and len(a) >= NUMPY_MIN:
+        return np.bitwise_xor(np.frombuffer(a, dtype=np.uint8), np.frombuffer(b, dtype=np.uint8)).tobytes()
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+'______________________________________________________________________________'
+
 def encode(c,code_type):
     """
     ----------------------------------------------------
@@ -838,10 +2363,8 @@ def encode(c,code_type):
         if (code_type == "ASCII"):
             b = str(dec_to_bin(ord(c),8))
         elif (code_type == "B6"):
-            for i in range(len(B6)):
-                if (c == B6[i]):
-                    b = str(dec_to_bin(i, 6))
-                    break;
+            if c in _B6_INDEX:
+                b = dec_to_bin(_B6_INDEX[c], 6)
         else: 
             print('Error(encode): Unsupported coding type')
             b = ""
@@ -880,4 +2403,90 @@ def decode(b,code_type):
             print('Error(decode): unsupported coding type')
             
 
-    return c
\ No newline at end of file
+    return c
+
+'______________________________________________________________________________'
+
+def encode_text(text, code_type, packed=False):
+    """
+    ----------------------------------------------------
+    Parameters:   text (str)
+                  code_type (str): ASCII or B6
+                  packed (bool): default = False
+    Return:       b (str): binary number, 8 (ASCII) or 6 (B6) bits per character
+                  or b (bytes) in packed mode:
+                      ASCII: one byte per character
+                      B6: 4 characters per 3 bytes, the last group is padded with code 0
+    Description:  Encodes a whole text, same result as joining encode(c) of every char
+                  Uses 256-entry lookup tables with str.translate/bytes.translate,
+                      B6 codes are packed and unpacked with base64
+                  As in encode, characters not in B6 are dropped in B6 encoding
+    Errors:       If text is not a string or has characters beyond 8 bits (ASCII):
+                    print 'Error(encode_text): invalid input' and return ''
+                  If unsupported encoding type:
+                    print 'Error(encode_text): unsupported coding type' and return ''
+    ---------------------------------------------------
+    """
+    if type(text) != str:
+        print('Error(encode_text): invalid input')
+        return ''
+    if code_type == "ASCII":
+        try:
+            data = text.encode('latin-1')
+        except UnicodeEncodeError:
+            print('Error(encode_text): invalid input')
+            return ''
+        return data if packed else text.translate(_ASCII_BITS)
+    elif code_type == "B6":
+        data = text.encode('ascii', 'ignore').translate(None, _NON_B6)
+        if not packed:
+            return data.decode('ascii').translate(_B6_BITS)
+        data = data.translate(_B6_TO_BASE64)
+        return base64.b64decode(data + b'A' * (-len(data) % 4))
+    print('Error(encode_text): unsupported coding type')
+    return ''
+
+'______________________________________________________________________________'
+
+def decode_text(b, code_type, packed=False, size=None):
+    """
+    ----------------------------------------------------
+    Parameters:   b (str): binary number (8 bits per ASCII char, 6 bits per B6 char)
+                      or b (bytes/bytearray) in packed mode (see encode_text)
+                  code_type (str): ASCII or B6
+                  packed (bool): default = False
+                  size (int): number of characters to keep, default = None (all)
+                      needed for packed B6 when the text length is not a multiple of 4
+    Return:       text (str)
+    Description:  Decodes a whole text encoded by encode_text
+    Errors:       If b is not a valid binary number/buffer of the coding type:
+                    print 'Error(decode_text): invalid input' and return ''
+                  If unsupported encoding type:
+                    print 'Error(decode_text): unsupported coding type' and return ''
+    ---------------------------------------------------
+    """
+    if code_type not in ("ASCII", "B6"):
+        print('Error(decode_text): unsupported coding type')
+        return ''
+    bits = 8 if code_type == "ASCII" else 6
+    if packed:
+        valid = type(b) in (bytes, bytearray) and (code_type == "ASCII" or len(b) % 3 == 0)
+    else:
+        valid = b == "" or (is_binary(b) and len(b) % bits == 0)
+    if not valid:
+        print('Error(decode_text): invalid input')
+        return ''
+    if len(b) == 0:
+        return ''
+
+    if code_type == "ASCII":
+        text = (b if packed else bin_to_bytes(b)).decode('latin-1')
+    else:
+        if not packed:
+            count = len(b) // 6
+            b = int(b + '0' * (-len(b) % 24), 2).to_bytes(-(-len(b) // 24) * 3, 'big')
+            size = count if size == None else min(size, count)
+        text = base64.b64encode(b).translate(_BASE64_TO_B6).decode('ascii')
+    if size != None:
+        text = text[:size]
+    return text